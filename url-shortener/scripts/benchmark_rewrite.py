@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the URL rewrite step of shorten_urls.py
+
+Compares the single-pass span rewriter (rewrite_urls) against the previous
+approach of calling str.replace once per unique URL. No network access is
+needed: short links are generated locally.
+
+Usage:
+    python benchmark_rewrite.py
+    python benchmark_rewrite.py --size-mb 8 --links 5000 --repeat 3
+"""
+
+import sys
+import time
+import random
+import argparse
+
+from shorten_urls import URL_REGEX, rewrite_urls
+
+
+WORDS = ['lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur', 'adipiscing',
+         'elit', 'sed', 'do', 'eiusmod', 'tempor', 'incididunt', 'labore']
+
+
+def build_document(size_bytes, unique_links, seed=0):
+    """Build a text of roughly `size_bytes` with URLs drawn from `unique_links` targets."""
+    rng = random.Random(seed)
+    urls = [f"https://example.com/articles/{i}/{rng.randrange(10**6)}" for i in range(unique_links)]
+    # Some URLs are prefixes of others to exercise prefix-safe rewriting
+    urls += [url + '/comments' for url in urls[:unique_links // 10]]
+
+    parts = []
+    size = 0
+    while size < size_bytes:
+        if rng.random() < 0.1:
+            piece = rng.choice(urls)
+        else:
+            piece = rng.choice(WORDS)
+        parts.append(piece)
+        size += len(piece) + 1
+    return ' '.join(parts)
+
+
+def replace_per_url(text, url_mapping):
+    """The previous rewrite strategy: one full-text str.replace per URL."""
+    for url, shortened in url_mapping.items():
+        text = text.replace(url, shortened)
+    return text
+
+
+def time_call(func, *args, repeat=1):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark URL rewriting strategies')
+    parser.add_argument('--size-mb', type=float, nargs='+', default=[1, 4],
+                        help='Document sizes in megabytes (default: 1 4)')
+    parser.add_argument('--links', type=int, nargs='+', default=[1000, 5000],
+                        help='Unique link counts (default: 1000 5000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per case, best time is kept')
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'links':>7} {'matches':>8} {'str.replace':>12} {'rewrite_urls':>13} {'speedup':>8}")
+    print("-" * 62)
+
+    for size_mb in args.size_mb:
+        for links in args.links:
+            text = build_document(int(size_mb * 1024 * 1024), links)
+            unique_urls = list(dict.fromkeys(match.group() for match in URL_REGEX.finditer(text)))
+            url_mapping = {url: f"https://bit.ly/{i:07x}" for i, url in enumerate(unique_urls)}
+            matches = sum(1 for _ in URL_REGEX.finditer(text))
+
+            old_time, _ = time_call(replace_per_url, text, url_mapping, repeat=args.repeat)
+            new_time, _ = time_call(rewrite_urls, text, url_mapping, repeat=args.repeat)
+
+            print(f"{size_mb:>6.1f}MB {len(unique_urls):>7} {matches:>8} "
+                  f"{old_time:>11.3f}s {new_time:>12.3f}s {old_time / new_time:>7.1f}x")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for shorten_urls.py
+
+Starts a local stand-in for Bitly's /v4/shorten endpoint with configurable
+latency, error rate and rate limiting (429 + Retry-After), then measures
+links/sec and per-link latency (p50/p99) of shorten_urls_in_text() for each
+input size and concurrency level. No Bitly quota is used.
+
+Usage:
+    python benchmark_shortener.py
+    python benchmark_shortener.py --links 100 1000 --workers 1 8 32 --latency 0.05
+    python benchmark_shortener.py --error-rate 0.02 --limit-per-second 200 --json
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import statistics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import shorten_urls
+from shorten_urls import BitlyBackend, ShortenerBackend, TokenPool, create_session, shorten_urls_in_text
+
+
+class FakeBitlyServer:
+    """
+    Local HTTP server answering POST /v4/shorten like Bitly.
+
+    Args:
+        latency: Mean response delay in seconds
+        jitter: Uniform +/- jitter added to the delay, in seconds
+        error_rate: Fraction of requests answered with HTTP 500
+        rate_limit_rate: Fraction of requests answered with HTTP 429
+        limit_per_second: If set, requests above this rate get HTTP 429
+        retry_after: Retry-After value sent with 429 responses
+    """
+
+    def __init__(self, latency=0.02, jitter=0.0, error_rate=0.0, rate_limit_rate=0.0,
+                 limit_per_second=None, retry_after=0.1, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.limit_per_second = limit_per_second
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {'requests': 0, 'ok': 0, 'errors': 0, 'rate_limited': 0}
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/v4/shorten"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _decide(self):
+        """Pick the outcome for one request: ('ok' | 'error' | 'rate_limited', remaining)."""
+        with self.lock:
+            self.counts['requests'] += 1
+            remaining = None
+            if self.limit_per_second:
+                now = time.monotonic()
+                if now - self._window_start >= 1.0:
+                    self._window_start = now
+                    self._window_count = 0
+                self._window_count += 1
+                remaining = max(int(self.limit_per_second) - self._window_count, 0)
+                if self._window_count > self.limit_per_second:
+                    self.counts['rate_limited'] += 1
+                    return 'rate_limited', 0
+
+            roll = self.random.random()
+            if roll < self.rate_limit_rate:
+                self.counts['rate_limited'] += 1
+                return 'rate_limited', remaining
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.counts['errors'] += 1
+                return 'error', remaining
+
+            self.counts['ok'] += 1
+            return 'ok', remaining
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Avoid Nagle/delayed-ACK stalls adding ~40ms to every keep-alive response
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                outcome, remaining = fake._decide()
+                delay = fake.latency + fake.random.uniform(-fake.jitter, fake.jitter)
+                time.sleep(max(delay, 0.0))
+
+                if outcome == 'ok':
+                    long_url = json.loads(body or b'{}').get('long_url', '')
+                    payload = {'link': f"https://bit.ly/{abs(hash(long_url)) % 62 ** 7:x}",
+                               'long_url': long_url}
+                    self._send(200, payload, remaining)
+                elif outcome == 'rate_limited':
+                    self._send(429, {'message': 'RATE_LIMIT_EXCEEDED'}, remaining,
+                               {'Retry-After': str(fake.retry_after)})
+                else:
+                    self._send(500, {'message': 'INTERNAL_ERROR'}, remaining)
+
+            def _send(self, status, payload, remaining, extra_headers=None):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                if remaining is not None:
+                    self.send_header('X-RateLimit-Remaining', str(remaining))
+                    self.send_header('X-RateLimit-Reset', '1')
+                for name, value in (extra_headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class TimedBackend(ShortenerBackend):
+    """Wrap a backend and record how long each shorten() call takes."""
+
+    name = 'timed'
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.durations = []
+        self.lock = threading.Lock()
+
+    def shorten(self, url, session=None):
+        start = time.perf_counter()
+        try:
+            return self.backend.shorten(url, session)
+        finally:
+            with self.lock:
+                self.durations.append(time.perf_counter() - start)
+
+
+def build_text(links, seed=0):
+    rng = random.Random(seed)
+    return '\n'.join(f"Item {i}: https://example.com/articles/{i}/{rng.randrange(10**9)}"
+                     for i in range(links))
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1]
+
+
+def run_case(links, workers, rate, burst):
+    """Shorten a document with `links` unique URLs; return the measurements."""
+    text = build_text(links)
+    backend = TimedBackend(BitlyBackend(TokenPool(['benchmark-token'], rate=rate, burst=burst)))
+    session = create_session(workers)
+
+    start = time.perf_counter()
+    try:
+        _, url_mapping = shorten_urls_in_text(text, backend, workers=workers, session=session)
+    finally:
+        session.close()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'links': links,
+        'workers': workers,
+        'seconds': elapsed,
+        'links_per_second': links / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(backend.durations, 50) * 1000,
+        'p99_ms': percentile(backend.durations, 99) * 1000,
+        'shortened': len(url_mapping),
+        'failed': links - len(url_mapping),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark shorten_urls.py against a local fake Bitly server'
+    )
+    parser.add_argument('--links', type=int, nargs='+', default=[50, 200],
+                        help='Unique URLs per input document (default: 50 200)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8, 32],
+                        help='Concurrency levels (default: 1 8 32)')
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help='Fake server response time in seconds (default: 0.02)')
+    parser.add_argument('--jitter', type=float, default=0.005,
+                        help='Uniform +/- latency jitter in seconds (default: 0.005)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fraction of requests answered with HTTP 500 (default: 0)')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0,
+                        help='Fraction of requests answered with HTTP 429 (default: 0)')
+    parser.add_argument('--limit-per-second', type=float,
+                        help='Answer HTTP 429 above this many requests per second')
+    parser.add_argument('--retry-after', type=float, default=0.1,
+                        help='Retry-After seconds sent with 429 responses (default: 0.1)')
+    parser.add_argument('--client-rate', type=float, default=1000.0,
+                        help='Client-side token bucket rate per second (default: 1000)')
+    parser.add_argument('--client-burst', type=int, default=100,
+                        help='Client-side token bucket burst (default: 100)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON lines')
+    args = parser.parse_args()
+
+    server = FakeBitlyServer(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, limit_per_second=args.limit_per_second,
+        retry_after=args.retry_after
+    )
+
+    with server:
+        # shorten_url() reads the module constant at call time
+        shorten_urls.BITLY_API_URL = server.url
+
+        if not args.json:
+            print(f"Fake Bitly at {server.url} (latency {args.latency * 1000:.0f}ms, "
+                  f"errors {args.error_rate:.0%}, 429s {args.rate_limit_rate:.0%})")
+            print(f"{'links':>7} {'workers':>8} {'seconds':>9} {'links/s':>9} "
+                  f"{'p50 ms':>8} {'p99 ms':>8} {'failed':>7}")
+            print("-" * 62)
+
+        for links in args.links:
+            for workers in args.workers:
+                result = run_case(links, workers, args.client_rate, args.client_burst)
+                if args.json:
+                    print(json.dumps(result))
+                else:
+                    print(f"{result['links']:>7} {result['workers']:>8} {result['seconds']:>9.2f} "
+                          f"{result['links_per_second']:>9.1f} {result['p50_ms']:>8.1f} "
+                          f"{result['p99_ms']:>8.1f} {result['failed']:>7}")
+
+        if not args.json:
+            counts = server.counts
+            print(f"\nServer: {counts['requests']} request(s), {counts['ok']} ok, "
+                  f"{counts['errors']} error(s), {counts['rate_limited']} rate-limited")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
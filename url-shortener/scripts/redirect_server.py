@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Redirect server for the local URL shortener backend
+
+Serves the short links created by `shorten_urls.py --backend local`:
+GET /<code> answers with a 301 redirect to the original URL.
+
+Usage:
+    python redirect_server.py
+    python redirect_server.py --port 8080 --db ~/.cache/url-shortener/local.sqlite3
+"""
+
+import sys
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from shorten_urls import DEFAULT_LOCAL_DB_PATH, LocalBackend
+
+
+def make_handler(backend):
+    """Build a request handler class bound to a LocalBackend."""
+
+    class RedirectHandler(BaseHTTPRequestHandler):
+        def _redirect(self, send_body):
+            code = self.path.split('?', 1)[0].strip('/')
+            long_url = backend.resolve(code) if code else None
+
+            if long_url is None:
+                body = b'Short link not found\n'
+                self.send_response(404)
+                self.send_header('Content-Type', 'text/plain; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+                return
+
+            self.send_response(301)
+            self.send_header('Location', long_url)
+            self.send_header('Content-Length', '0')
+            self.send_header('Cache-Control', 'public, max-age=86400')
+            self.end_headers()
+
+        def do_GET(self):
+            self._redirect(send_body=True)
+
+        def do_HEAD(self):
+            self._redirect(send_body=False)
+
+        def log_message(self, format, *args):
+            if self.server.verbose:
+                super().log_message(format, *args)
+
+    return RedirectHandler
+
+
+def serve(backend, host='127.0.0.1', port=8080, verbose=False):
+    """Run the redirect server until interrupted."""
+    server = ThreadingHTTPServer((host, port), make_handler(backend))
+    server.verbose = verbose
+    print(f"🔗 Serving short links from {backend.path} on http://{host}:{port}/", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Serve redirects for links created by the local shortener backend'
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='Port (default: 8080)')
+    parser.add_argument('--db', default=str(DEFAULT_LOCAL_DB_PATH),
+                        help=f'SQLite store of the local backend (default: {DEFAULT_LOCAL_DB_PATH})')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    backend = LocalBackend(args.db)
+    try:
+        serve(backend, args.host, args.port, verbose=args.verbose)
+    finally:
+        backend.close()
+
+
+if __name__ == '__main__':
+    main()
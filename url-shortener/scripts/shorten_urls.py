@@ -3,20 +3,36 @@
 URL Shortener Script using Bitly API
 
 Finds all URLs in a given text and shortens them using Bitly API.
-Requires BITLY_TOKEN in environment variables or .env file.
+Requires BITLY_TOKEN in environment variables or .env file, unless the
+self-hosted local backend is used (--backend local, see redirect_server.py).
+
+Shortened links are cached on disk (SQLite) so repeat runs do not call
+Bitly again for URLs that were already shortened.
 
 Usage:
     python shorten_urls.py "Your text with https://example.com/long/url here"
+    python shorten_urls.py --no-cache "Your text with URLs here"
+    python shorten_urls.py --input newsletter.md --output short.md --mapping-out links.jsonl
+    cat export.log | python shorten_urls.py > short.log
+    python shorten_urls.py --backend local "Your text with URLs here"
 """
 
 import os
 import re
 import sys
 import json
+import time
+import sqlite3
+import asyncio
+import argparse
+import threading
 from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
 except ImportError:
     print("Error: 'requests' library not found. Install with: pip install requests", file=sys.stderr)
     sys.exit(1)
@@ -30,9 +46,67 @@ except ImportError:
 
 # URL regex pattern - matches http:// and https:// URLs
 URL_PATTERN = r'https?://[^\s<>"\']+'
+URL_REGEX = re.compile(URL_PATTERN)
+
+# Sentence punctuation that URL_PATTERN swallows at the end of a URL
+TRAILING_PUNCTUATION = '.,;:!?*_~`'
+CLOSING_BRACKETS = {')': '(', ']': '[', '}': '{'}
+
+# Query parameters that only carry click-tracking data
+TRACKING_PARAM_REGEX = re.compile(
+    r'^(?:utm_[a-z_]+|fbclid|gclid|dclid|gbraid|wbraid|msclkid|yclid|igshid|'
+    r'mc_cid|mc_eid|_hsenc|_hsmi|mkt_tok)$',
+    re.IGNORECASE
+)
+
+# Links on these domains are already short and are never sent to Bitly
+DEFAULT_SKIP_DOMAINS = (
+    'bit.ly', 'bitly.com', 'j.mp', 'youtu.be', 't.co', 'goo.gl', 'tinyurl.com',
+    'ow.ly', 'buff.ly', 'is.gd', 'rb.gy', 'lnkd.in',
+)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Markdown code: fenced blocks (``` or ~~~) and inline `code` spans
+CODE_REGEX = re.compile(
+    r'^[ \t]*(?P<fence>`{3,}|~{3,})[^\n]*\n.*?(?:^[ \t]*(?P=fence)[ \t]*$|\Z)'
+    r'|(?P<ticks>`+)[^`\n]+?(?P=ticks)',
+    re.MULTILINE | re.DOTALL
+)
+
+# Bitly API endpoint (overridable, e.g. to point at benchmark_shortener.py's fake server)
+BITLY_API_URL = os.getenv('BITLY_API_URL', "https://api-ssl.bitly.com/v4/shorten")
+
+# Local backend defaults
+DEFAULT_LOCAL_DB_PATH = Path.home() / '.cache' / 'url-shortener' / 'local.sqlite3'
+DEFAULT_LOCAL_BASE_URL = 'http://localhost:8080/'
+BASE62_ALPHABET = '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+# Circuit breaker defaults for the Bitly backend
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 60.0  # seconds
+
+# Short-link cache defaults
+DEFAULT_CACHE_PATH = Path.home() / '.cache' / 'url-shortener' / 'links.sqlite3'
+DEFAULT_CACHE_TTL = 30 * 24 * 60 * 60  # seconds
+DEFAULT_CACHE_MAX_ENTRIES = 100_000
 
-# Bitly API endpoint
-BITLY_API_URL = "https://api-ssl.bitly.com/v4/shorten"
+# Concurrent shortening defaults
+DEFAULT_WORKERS = 8
+
+# Streaming mode defaults
+DEFAULT_BLOCK_LINES = 1000
+DEFAULT_MAX_LINE_CHARS = 1024 * 1024
+DEFAULT_STREAM_MEMO = 50_000
+
+# Rate limiting defaults (per Bitly token)
+DEFAULT_RATE = 5.0  # requests per second
+DEFAULT_BURST = 10
+DEFAULT_RETRY_AFTER = 2.0
+MAX_RETRIES = 5
+
+# Start/end line of a Markdown fenced code block
+FENCE_REGEX = re.compile(r'^[ \t]*(`{3,}|~{3,})')
 
 
 def load_bitly_token():
@@ -52,28 +126,229 @@ def load_bitly_token():
     return token
 
 
-def shorten_url(url, token):
+def load_bitly_tokens():
+    """
+    Load one or more Bitly API tokens from environment or .env file.
+
+    BITLY_TOKENS (comma-separated) takes precedence; BITLY_TOKEN may also
+    hold several comma-separated tokens.
+    """
+    load_dotenv()
+
+    value = os.getenv('BITLY_TOKENS') or os.getenv('BITLY_TOKEN')
+    tokens = [token.strip() for token in (value or '').split(',') if token.strip()]
+    if not tokens:
+        # Reuse the single-token error message and exit
+        return [load_bitly_token()]
+
+    return list(dict.fromkeys(tokens))
+
+
+def _parse_retry_after(headers):
+    """Return seconds to wait from Retry-After (or rate-limit reset) headers."""
+    for name in ('Retry-After', 'X-RateLimit-Reset'):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            delay = float(value)
+        except ValueError:
+            continue
+        # Reset headers may carry an absolute epoch timestamp
+        if delay > 1e9:
+            delay -= time.time()
+        return max(delay, 0.0)
+    return DEFAULT_RETRY_AFTER
+
+
+class _TokenBucket:
+    """Token bucket for a single Bitly token."""
+
+    def __init__(self, token, rate, burst):
+        self.token = token
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def ready_at(self, now):
+        self._refill(now)
+        ready = now if self.tokens >= 1 else now + (1 - self.tokens) / self.rate
+        return max(ready, self.blocked_until)
+
+    def block(self, seconds):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class TokenPool:
+    """
+    Rate-limit scheduler spreading Bitly calls over one or more tokens.
+
+    Each token gets a token bucket (`rate` requests/second, bursts of up to
+    `burst`). Calls are paced before they are sent, and the bucket is
+    adjusted from Bitly's X-RateLimit-* headers and Retry-After on 429, so
+    bulk runs slow down instead of losing links. Thread-safe; pass it to
+    shorten_url() and friends in place of a single token string.
+    """
+
+    def __init__(self, tokens, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        if isinstance(tokens, str):
+            tokens = [tokens]
+        self._buckets = {token: _TokenBucket(token, rate, burst) for token in tokens}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.rate_limited = 0
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def acquire(self):
+        """Block until some token may send a request, then return that token."""
+        while True:
+            with self._lock:
+                if not self._buckets:
+                    raise RuntimeError('No usable Bitly tokens left in the pool')
+                now = time.monotonic()
+                bucket = min(self._buckets.values(), key=lambda b: b.ready_at(now))
+                wait = bucket.ready_at(now) - now
+                if wait <= 0:
+                    bucket.tokens -= 1
+                    self.requests += 1
+                    return bucket.token
+            time.sleep(min(wait, 1.0))
+
+    def update(self, token, headers):
+        """Apply X-RateLimit-Remaining / X-RateLimit-Reset from a response."""
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining is None:
+            return
+        try:
+            remaining = int(remaining)
+        except ValueError:
+            return
+        with self._lock:
+            bucket = self._buckets.get(token)
+            if bucket is None:
+                return
+            bucket.tokens = min(bucket.tokens, remaining)
+            if remaining <= 0:
+                bucket.block(_parse_retry_after(headers))
+
+    def backoff(self, token, seconds):
+        """Pause a token after a 429."""
+        with self._lock:
+            self.rate_limited += 1
+            bucket = self._buckets.get(token)
+            if bucket is not None:
+                bucket.block(seconds)
+
+    def remove(self, token):
+        """Drop a token that Bitly rejected; return the number left."""
+        with self._lock:
+            self._buckets.pop(token, None)
+            return len(self._buckets)
+
+    def stats(self):
+        return {'tokens': len(self._buckets), 'requests': self.requests,
+                'rate_limited': self.rate_limited}
+
+
+def create_session(pool_size=DEFAULT_WORKERS):
+    """
+    Create a keep-alive HTTP session sized for `pool_size` concurrent requests.
+
+    Reusing one session avoids a new TCP/TLS handshake for every Bitly call.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class BackendUnavailable(Exception):
+    """The shortening service failed (network, server or rate limit), as opposed to rejecting one URL."""
+
+
+class BitlyAuthError(BackendUnavailable):
+    """Every Bitly token was rejected with HTTP 403."""
+
+
+def shorten_url(url, token, session=None):
     """
     Shorten a single URL using Bitly API.
 
+    Rate-limited (429) calls are retried after Retry-After, up to
+    MAX_RETRIES times. With a TokenPool, calls are also paced up front and
+    spread across the pool's tokens.
+
     Args:
         url: The long URL to shorten
-        token: Bitly API token
+        token: Bitly API token, a TokenPool, or a ShortenerBackend
+        session: Optional requests.Session to reuse pooled connections
 
     Returns:
         Shortened URL string or None if failed
     """
-    headers = {
-        'Authorization': f'Bearer {token}',
-        'Content-Type': 'application/json'
-    }
+    if isinstance(token, ShortenerBackend):
+        try:
+            return token.shorten(url, session)
+        except BackendUnavailable as e:
+            print(f"Warning: Failed to shorten '{url}': {e}", file=sys.stderr)
+            return None
+
+    try:
+        return _bitly_shorten(url, token, session)
+    except BitlyAuthError:
+        print(f"Error: Invalid BITLY_TOKEN or insufficient permissions", file=sys.stderr)
+        sys.exit(1)
+    except BackendUnavailable as e:
+        print(f"Warning: Failed to shorten '{url}': {e}", file=sys.stderr)
+        return None
+
+
+def _bitly_shorten(url, token, session=None):
+    """
+    Call Bitly for one URL.
+
+    Returns:
+        Shortened URL string, or None if Bitly rejected this URL (HTTP 400)
+
+    Raises:
+        BitlyAuthError: no token is accepted any more (HTTP 403)
+        BackendUnavailable: network error, unexpected status or rate limited
+            after MAX_RETRIES retries
+    """
+    pool = token if isinstance(token, TokenPool) else None
 
     data = {
         'long_url': url
     }
 
-    try:
-        response = requests.post(BITLY_API_URL, headers=headers, json=data, timeout=10)
+    http = session if session is not None else requests
+
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            current_token = pool.acquire() if pool is not None else token
+        except RuntimeError as e:
+            raise BitlyAuthError(str(e))
+        headers = {
+            'Authorization': f'Bearer {current_token}',
+            'Content-Type': 'application/json'
+        }
+
+        try:
+            response = http.post(BITLY_API_URL, headers=headers, json=data, timeout=10)
+        except requests.exceptions.RequestException as e:
+            raise BackendUnavailable(f"Network error: {e}")
+
+        if pool is not None:
+            pool.update(current_token, response.headers)
 
         if response.status_code in [200, 201]:
             result = response.json()
@@ -83,94 +358,947 @@ def shorten_url(url, token):
             print(f"Warning: Failed to shorten '{url}': {error_data.get('message', 'Bad request')}", file=sys.stderr)
             return None
         elif response.status_code == 403:
-            print(f"Error: Invalid BITLY_TOKEN or insufficient permissions", file=sys.stderr)
-            sys.exit(1)
+            if pool is not None and pool.remove(current_token) > 0:
+                print("Warning: Dropping a Bitly token rejected with HTTP 403", file=sys.stderr)
+                continue
+            raise BitlyAuthError('Invalid BITLY_TOKEN or insufficient permissions')
+        elif response.status_code == 429:
+            delay = _parse_retry_after(response.headers)
+            if pool is not None:
+                pool.backoff(current_token, delay)
+            else:
+                time.sleep(delay)
+            continue
         else:
-            print(f"Warning: Failed to shorten '{url}': HTTP {response.status_code}", file=sys.stderr)
+            raise BackendUnavailable(f"HTTP {response.status_code}")
+
+    raise BackendUnavailable(f"still rate limited after {MAX_RETRIES} retries")
+
+
+class ShortLinkCache:
+    """
+    Persistent long URL -> short URL cache backed by SQLite.
+
+    Links are kept per backend namespace ('bitly', 'local:<base url>', see
+    ShortenerBackend.cache_namespace), so a link made by one backend is
+    never returned to another. Entries expire after `ttl` seconds and the
+    table is kept under `max_entries` rows by evicting the least recently
+    used links. The short_url column is indexed so reverse (short -> long)
+    lookups do not need a table scan.
+
+    Writes are batched: hits only note the new last_used time and new links
+    are not committed until flush(), which the shorten_urls_in_* functions
+    call once per call (per block when streaming) and close() calls too.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_CACHE_TTL,
+                 max_entries=DEFAULT_CACHE_MAX_ENTRIES):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._touched = {}  # (backend, long_url) -> last_used not yet written
+        self._count = None  # upper bound on the row count, see _evict()
+
+        if str(path) != ':memory:':
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS short_links ('
+            ' backend TEXT NOT NULL,'
+            ' long_url TEXT NOT NULL,'
+            ' short_url TEXT NOT NULL,'
+            ' created_at REAL NOT NULL,'
+            ' last_used REAL NOT NULL,'
+            ' PRIMARY KEY (backend, long_url))'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS short_links_short_url ON short_links (short_url)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS short_links_last_used ON short_links (last_used)')
+        self._migrate()
+        self.conn.commit()
+
+    def _migrate(self):
+        """Move links from the old backend-less table; only bit.ly links are known to be Bitly's."""
+        (old_table,) = self.conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'links'"
+        ).fetchone()
+        if not old_table:
+            return
+        self.conn.execute(
+            "INSERT OR IGNORE INTO short_links (backend, long_url, short_url, created_at, last_used) "
+            "SELECT 'bitly', long_url, short_url, created_at, last_used FROM links "
+            "WHERE short_url LIKE 'https://bit.ly/%' OR short_url LIKE 'http://bit.ly/%'"
+        )
+        self.conn.execute('DROP TABLE links')
+
+    def _is_expired(self, created_at, now):
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def get(self, long_url, backend='bitly'):
+        """Return the cached short URL for `long_url`, or None on a miss."""
+        now = time.time()
+        row = self.conn.execute(
+            'SELECT short_url, created_at FROM short_links WHERE backend = ? AND long_url = ?',
+            (backend, long_url)
+        ).fetchone()
+
+        if row is None or self._is_expired(row[1], now):
+            if row is not None:
+                self.conn.execute('DELETE FROM short_links WHERE backend = ? AND long_url = ?',
+                                  (backend, long_url))
+                self._touched.pop((backend, long_url), None)
+            self.misses += 1
+            return None
+
+        self._touched[(backend, long_url)] = now
+        self.hits += 1
+        return row[0]
+
+    def put(self, long_url, short_url, backend='bitly'):
+        """Store a long -> short mapping and evict old entries if over capacity."""
+        now = time.time()
+        self.conn.execute(
+            'INSERT OR REPLACE INTO short_links (backend, long_url, short_url, created_at, last_used) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (backend, long_url, short_url, now, now)
+        )
+        self._touched.pop((backend, long_url), None)
+        if self._count is not None:
+            self._count += 1
+        self._evict()
+
+    def flush(self):
+        """Write the pending last_used times and commit everything since the last flush."""
+        if self._touched:
+            self.conn.executemany(
+                'UPDATE short_links SET last_used = ? WHERE backend = ? AND long_url = ?',
+                [(last_used, backend, long_url) for (backend, long_url), last_used in self._touched.items()]
+            )
+            self._touched.clear()
+        self.conn.commit()
+
+    def lookup_long(self, short_url):
+        """Reverse lookup: return the long URL for a short link, or None."""
+        row = self.conn.execute(
+            'SELECT long_url, created_at FROM short_links WHERE short_url = ?', (short_url,)
+        ).fetchone()
+        if row is None or self._is_expired(row[1], time.time()):
+            return None
+        return row[0]
+
+    def _evict(self):
+        """
+        Drop the least recently used links over max_entries. The row count
+        is only read from the table when the in-memory upper bound (every
+        put() counted as a new row) goes over the limit, and 1% extra is
+        evicted so a full cache is not recounted on every put().
+        """
+        if not self.max_entries or (self._count is not None and self._count <= self.max_entries):
+            return
+        self.flush()  # eviction order depends on the pending last_used times
+        (self._count,) = self.conn.execute('SELECT COUNT(*) FROM short_links').fetchone()
+        excess = self._count - self.max_entries
+        if excess > 0:
+            excess = min(excess + self.max_entries // 100, self._count)
+            self.conn.execute(
+                'DELETE FROM short_links WHERE rowid IN '
+                '(SELECT rowid FROM short_links ORDER BY last_used ASC LIMIT ?)',
+                (excess,)
+            )
+            self._count -= excess
+
+    def stats(self):
+        """Return hit/miss counters and the number of stored links."""
+        (entries,) = self.conn.execute('SELECT COUNT(*) FROM short_links').fetchone()
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries}
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+def encode_base62(number):
+    """Encode a non-negative integer with BASE62_ALPHABET."""
+    if number == 0:
+        return BASE62_ALPHABET[0]
+    digits = []
+    while number:
+        number, remainder = divmod(number, 62)
+        digits.append(BASE62_ALPHABET[remainder])
+    return ''.join(reversed(digits))
+
+
+def decode_base62(code):
+    """Decode a BASE62_ALPHABET string; raises ValueError on invalid input."""
+    number = 0
+    for char in code:
+        index = BASE62_ALPHABET.find(char)
+        if index < 0:
+            raise ValueError(f"Invalid short code: {code!r}")
+        number = number * 62 + index
+    return number
+
+
+class ShortenerBackend:
+    """
+    Interface for link shortening services.
+
+    A backend can be passed to shorten_url(), shorten_urls_in_text() and
+    friends wherever a Bitly token is accepted.
+    """
+
+    name = 'backend'
+
+    def shorten(self, url, session=None):
+        """
+        Return the short link for `url`, or None if the service rejected
+        this URL. Raise BackendUnavailable when the service itself fails.
+        """
+        raise NotImplementedError
+
+    def cache_namespace(self):
+        """Key under which this backend's links are kept in the ShortLinkCache."""
+        return self.name
+
+    def cacheable(self, short_url):
+        """Whether `short_url` may be stored in the ShortLinkCache."""
+        return True
+
+    def stats(self):
+        return {}
+
+
+class BitlyBackend(ShortenerBackend):
+    """Bitly API backend; `token` is a token string or a TokenPool."""
+
+    name = 'bitly'
+
+    def __init__(self, token):
+        self.token = token
+
+    def shorten(self, url, session=None):
+        return _bitly_shorten(url, self.token, session)
+
+    def stats(self):
+        return self.token.stats() if isinstance(self.token, TokenPool) else {}
+
+
+class LocalBackend(ShortenerBackend):
+    """
+    Self-hosted backend: SQLite store with sequential base62 short codes.
+
+    Links are `base_url` + code; serve them with redirect_server.py.
+    Shortening the same URL twice returns the same link.
+    """
+
+    name = 'local'
+
+    def __init__(self, path=DEFAULT_LOCAL_DB_PATH, base_url=DEFAULT_LOCAL_BASE_URL):
+        self.path = Path(path)
+        self.base_url = base_url if base_url.endswith('/') else base_url + '/'
+        self._lock = threading.Lock()
+
+        if str(path) != ':memory:':
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS local_links ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' long_url TEXT NOT NULL UNIQUE,'
+            ' created_at REAL NOT NULL)'
+        )
+        self.conn.commit()
+
+    def shorten(self, url, session=None):
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT id FROM local_links WHERE long_url = ?', (url,)
+            ).fetchone()
+            if row is None:
+                cursor = self.conn.execute(
+                    'INSERT INTO local_links (long_url, created_at) VALUES (?, ?)',
+                    (url, time.time())
+                )
+                self.conn.commit()
+                link_id = cursor.lastrowid
+            else:
+                link_id = row[0]
+        return self.base_url + encode_base62(link_id)
+
+    def cache_namespace(self):
+        return f"{self.name}:{self.base_url}"
+
+    def resolve(self, code):
+        """Return the long URL for a short code, or None if unknown."""
+        try:
+            link_id = decode_base62(code)
+        except ValueError:
             return None
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT long_url FROM local_links WHERE id = ?', (link_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def stats(self):
+        with self._lock:
+            (links,) = self.conn.execute('SELECT COUNT(*) FROM local_links').fetchone()
+        return {'links': links}
+
+    def close(self):
+        self.conn.close()
+
+
+class CircuitBreakerBackend(ShortenerBackend):
+    """
+    Send calls to `primary`, falling back to `fallback` when it fails.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls go straight to the fallback for `reset_timeout` seconds; then one
+    trial call is let through to the primary again.
+    """
+
+    name = 'circuit-breaker'
 
-    except requests.exceptions.RequestException as e:
-        print(f"Warning: Network error while shortening '{url}': {e}", file=sys.stderr)
+    def __init__(self, primary, fallback, failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout=DEFAULT_RESET_TIMEOUT):
+        self.primary = primary
+        self.fallback = fallback
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.primary_calls = 0
+        self.fallback_calls = 0
+        self._fallback_links = set()
+        self._lock = threading.Lock()
+
+    def _allow_primary(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Half-open: let this call probe the primary
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def _record(self, success):
+        with self._lock:
+            if success:
+                self.failures = 0
+                self.opened_at = None
+            else:
+                self.failures += 1
+                if self.failures >= self.failure_threshold and self.opened_at is None:
+                    self.opened_at = time.monotonic()
+                    print(f"Warning: {self.primary.name} backend failing, "
+                          f"switching to {self.fallback.name} for {self.reset_timeout:.0f}s",
+                          file=sys.stderr)
+
+    def shorten(self, url, session=None):
+        if self._allow_primary():
+            self.primary_calls += 1
+            try:
+                shortened = self.primary.shorten(url, session)
+            except BackendUnavailable as e:
+                print(f"Warning: {self.primary.name} failed for '{url}': {e}", file=sys.stderr)
+                self._record(False)
+            else:
+                # A rejected URL (None) is not a backend failure; keep the original
+                self._record(True)
+                return shortened
+
+        self.fallback_calls += 1
+        shortened = self.fallback.shorten(url, session)
+        if shortened:
+            with self._lock:
+                self._fallback_links.add(shortened)
+        return shortened
+
+    def cache_namespace(self):
+        return self.primary.cache_namespace()
+
+    def cacheable(self, short_url):
+        """Fallback links are not cached, so the primary is asked again once it recovers."""
+        with self._lock:
+            return short_url not in self._fallback_links
+
+    def stats(self):
+        return {
+            'state': 'closed' if self.opened_at is None else 'open',
+            'primary_calls': self.primary_calls,
+            'fallback_calls': self.fallback_calls,
+        }
+
+
+def compile_skip_domains(domains):
+    """Compile a regex matching hosts on (or under) any of `domains`."""
+    alternatives = '|'.join(re.escape(domain.lower().strip('.')) for domain in domains if domain)
+    if not alternatives:
         return None
+    return re.compile(rf'(?:^|\.)(?:{alternatives})$')
 
 
-def shorten_urls_in_text(text, token, verbose=False):
+SKIP_DOMAIN_REGEX = compile_skip_domains(DEFAULT_SKIP_DOMAINS)
+
+
+def trim_url(url):
     """
-    Find and shorten all URLs in the given text.
+    Strip trailing sentence punctuation that URL_PATTERN swallowed.
 
-    Args:
-        text: Input text containing URLs
-        token: Bitly API token
-        verbose: Print detailed information
+    Closing brackets are only stripped when unbalanced, so URLs such as
+    https://en.wikipedia.org/wiki/Python_(programming_language) stay intact.
+    """
+    while url:
+        last = url[-1]
+        if last in TRAILING_PUNCTUATION:
+            url = url[:-1]
+        elif last in CLOSING_BRACKETS and url.count(CLOSING_BRACKETS[last]) < url.count(last):
+            url = url[:-1]
+        else:
+            break
+    return url
 
-    Returns:
-        Tuple of (modified_text, url_mapping)
+
+def canonicalize_url(url):
+    """
+    Normalize a URL so equivalent links share one cache entry and Bitly call.
+
+    Lowercases the scheme and host, drops default ports, removes tracking
+    query parameters (utm_*, fbclid, ...) and sorts the remaining ones.
+    Parameter values are kept byte-for-byte.
+    """
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+
+    scheme = parts.scheme.lower()
+    userinfo, _, hostport = parts.netloc.rpartition('@')
+    host = (parts.hostname or '').lower()
+    if ':' in host:
+        host = f'[{host}]'
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{port}'
+    netloc = f'{userinfo}@{host}' if userinfo else host
+
+    params = [param for param in parts.query.split('&')
+              if param and not TRACKING_PARAM_REGEX.match(param.split('=', 1)[0])]
+    params.sort(key=lambda param: param.split('=', 1)[0])
+
+    return urlunsplit((scheme, netloc, parts.path or '/', '&'.join(params), parts.fragment))
+
+
+def is_short_link(url, skip_regex=SKIP_DOMAIN_REGEX):
+    """Return True if `url` is on a domain matched by `skip_regex`."""
+    if skip_regex is None:
+        return False
+    try:
+        host = urlsplit(url).hostname
+    except ValueError:
+        return False
+    return bool(host) and skip_regex.search(host) is not None
+
+
+def iter_url_matches(text, skip_code=False):
+    """
+    Yield (start, end, url) for each URL in `text` in a single left-to-right pass.
+
+    Trailing sentence punctuation is excluded from the span. With
+    skip_code=True, URLs inside Markdown fenced code blocks and inline
+    code spans are skipped.
+    """
+    code_spans = CODE_REGEX.finditer(text) if skip_code else iter(())
+    code = next(code_spans, None)
+    for match in URL_REGEX.finditer(text):
+        start = match.start()
+        # Both iterators are ordered by position, so advance the code span
+        # cursor instead of rescanning.
+        while code is not None and code.end() <= start:
+            code = next(code_spans, None)
+        if code is not None and code.start() <= start:
+            continue
+        url = trim_url(match.group())
+        yield start, start + len(url), url
+
+
+def rewrite_urls(text, url_mapping, skip_code=False):
     """
-    # Find all URLs in the text
-    urls = re.findall(URL_PATTERN, text)
+    Replace every URL in `text` that has an entry in `url_mapping`.
+
+    Works on match spans, so the text is rebuilt once with a single join and
+    a URL that is a prefix of another URL is never rewritten inside it.
+    """
+    parts = []
+    last_end = 0
+    for start, end, url in iter_url_matches(text, skip_code=skip_code):
+        shortened = url_mapping.get(url)
+        if shortened:
+            parts.append(text[last_end:start])
+            parts.append(shortened)
+            last_end = end
+
+    if not parts:
+        return text
+
+    parts.append(text[last_end:])
+    return ''.join(parts)
+
+
+def _find_unique_urls(text, verbose=False, skip_code=False):
+    """Return the distinct URLs in `text`, in order of first appearance."""
+    urls = [url for _, _, url in iter_url_matches(text, skip_code=skip_code)]
 
     if not urls:
         if verbose:
             print("No URLs found in the text.", file=sys.stderr)
-        return text, {}
+        return []
 
     if verbose:
         print(f"Found {len(urls)} URL(s) to shorten...", file=sys.stderr)
 
-    # Create mapping of original -> shortened URLs
-    url_mapping = {}
-    modified_text = text
+    return list(dict.fromkeys(urls))
+
 
-    for url in urls:
-        # Skip if already shortened
-        if url in url_mapping:
+def _plan_targets(unique_urls, canonicalize=True, skip_regex=SKIP_DOMAIN_REGEX, verbose=False):
+    """
+    Map each URL found in the text to the URL that should be shortened.
+
+    Already-short links are left out; with canonicalize=True, URLs that
+    differ only by tracking parameters etc. share one target.
+    """
+    targets = {}
+    for url in unique_urls:
+        if is_short_link(url, skip_regex):
+            if verbose:
+                print(f"Skipping already-short link: {url}", file=sys.stderr)
             continue
+        targets[url] = canonicalize_url(url) if canonicalize else url
+    return targets
+
+
+def _resolve_mapping(unique_urls, token, cache=None, workers=1, session=None, verbose=False,
+                     canonicalize=True, skip_regex=SKIP_DOMAIN_REGEX):
+    """Shorten `unique_urls` (cache first, then Bitly) and return original -> short."""
+    targets = _plan_targets(unique_urls, canonicalize, skip_regex, verbose=verbose)
+    target_urls = list(dict.fromkeys(targets.values()))
+
+    cached, pending = _lookup_cached(target_urls, cache, token)
+    fetched = _fetch_pending(pending, token, workers=workers, session=session)
+    shortened = _collect_mapping(target_urls, cached, fetched, cache=cache, verbose=verbose,
+                                 token=token)
 
+    return {url: shortened[target] for url, target in targets.items() if target in shortened}
+
+
+def _cache_namespace(token):
+    """ShortLinkCache namespace of a Bitly token, TokenPool or ShortenerBackend."""
+    return token.cache_namespace() if isinstance(token, ShortenerBackend) else BitlyBackend.name
+
+
+def _lookup_cached(unique_urls, cache, token=None):
+    """Split URLs into cached short links and URLs that still need Bitly."""
+    cached = {}
+    pending = []
+    namespace = _cache_namespace(token)
+    for url in unique_urls:
+        shortened = cache.get(url, namespace) if cache is not None else None
+        if shortened:
+            cached[url] = shortened
+        else:
+            pending.append(url)
+    return cached, pending
+
+
+def _fetch_pending(pending, token, workers=1, session=None):
+    """Shorten `pending` URLs via Bitly, concurrently when workers > 1."""
+    if workers > 1 and len(pending) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(lambda url: shorten_url(url, token, session), pending)
+            return dict(zip(pending, results))
+    return {url: shorten_url(url, token, session) for url in pending}
+
+
+def _collect_mapping(unique_urls, cached, fetched, cache=None, verbose=False, token=None):
+    """
+    Build the original -> short URL mapping and store new links in the cache
+    (under `token`'s namespace, skipping links the backend marks uncacheable).
+
+    URLs are processed in order of first appearance so the result is the
+    same no matter in which order the Bitly calls completed.
+    """
+    url_mapping = {}
+
+    for url in unique_urls:
         if verbose:
             print(f"Shortening: {url}", file=sys.stderr)
 
-        shortened = shorten_url(url, token)
+        if url in cached:
+            shortened = cached[url]
+            if verbose:
+                print("  (cached)", file=sys.stderr)
+        else:
+            shortened = fetched.get(url)
+            if shortened and cache is not None and (
+                    not isinstance(token, ShortenerBackend) or token.cacheable(shortened)):
+                cache.put(url, shortened, _cache_namespace(token))
 
         if shortened:
             url_mapping[url] = shortened
-            # Replace all occurrences of this URL
-            modified_text = modified_text.replace(url, shortened)
             if verbose:
                 print(f"  → {shortened}", file=sys.stderr)
         else:
             if verbose:
                 print(f"  → Keeping original URL", file=sys.stderr)
 
-    return modified_text, url_mapping
+    return url_mapping
+
+
+def shorten_urls_in_text(text, token, verbose=False, cache=None, workers=1, session=None,
+                         skip_code=False, canonicalize=True, skip_regex=SKIP_DOMAIN_REGEX):
+    """
+    Find and shorten all URLs in the given text.
+
+    Args:
+        text: Input text containing URLs
+        token: Bitly API token
+        verbose: Print detailed information
+        cache: Optional ShortLinkCache consulted before calling Bitly
+        workers: Number of concurrent Bitly requests (1 = sequential)
+        session: Optional requests.Session shared by all requests
+        skip_code: Leave URLs inside Markdown code blocks and inline code untouched
+        canonicalize: Normalize URLs (tracking params, host case, ...) before
+            the cache lookup and Bitly call
+        skip_regex: Compiled host regex for links that are already short
+            (see compile_skip_domains); None disables skipping
+
+    Returns:
+        Tuple of (modified_text, url_mapping)
+    """
+    unique_urls = _find_unique_urls(text, verbose=verbose, skip_code=skip_code)
+    if not unique_urls:
+        return text, {}
+
+    own_session = session is None and len(unique_urls) > 1
+    if own_session:
+        session = create_session(workers)
+
+    try:
+        url_mapping = _resolve_mapping(unique_urls, token, cache=cache, workers=workers,
+                                       session=session, verbose=verbose,
+                                       canonicalize=canonicalize, skip_regex=skip_regex)
+    finally:
+        if own_session:
+            session.close()
+        if cache is not None:
+            cache.flush()
+
+    # Replace all occurrences in one pass over the text
+    return rewrite_urls(text, url_mapping, skip_code=skip_code), url_mapping
+
+
+async def ashorten_urls_in_text(text, token, verbose=False, cache=None,
+                                workers=DEFAULT_WORKERS, session=None, skip_code=False,
+                                canonicalize=True, skip_regex=SKIP_DOMAIN_REGEX):
+    """
+    Asyncio entry point for shorten_urls_in_text().
+
+    Bitly calls run in worker threads (at most `workers` at a time) over a
+    shared keep-alive session, so the event loop is never blocked. The
+    result is identical to the sequential path.
+
+    Returns:
+        Tuple of (modified_text, url_mapping)
+    """
+    unique_urls = _find_unique_urls(text, verbose=verbose, skip_code=skip_code)
+    if not unique_urls:
+        return text, {}
+
+    targets = _plan_targets(unique_urls, canonicalize, skip_regex, verbose=verbose)
+    target_urls = list(dict.fromkeys(targets.values()))
+    cached, pending = _lookup_cached(target_urls, cache, token)
+
+    own_session = session is None and bool(pending)
+    if own_session:
+        session = create_session(workers)
+
+    semaphore = asyncio.Semaphore(max(workers, 1))
+
+    async def shorten_one(url):
+        async with semaphore:
+            return await asyncio.to_thread(shorten_url, url, token, session)
+
+    try:
+        results = await asyncio.gather(*(shorten_one(url) for url in pending))
+    finally:
+        if own_session:
+            session.close()
+
+    fetched = dict(zip(pending, results))
+    shortened = _collect_mapping(target_urls, cached, fetched, cache=cache, verbose=verbose,
+                                 token=token)
+    if cache is not None:
+        cache.flush()
+    url_mapping = {url: shortened[target] for url, target in targets.items() if target in shortened}
+
+    # Replace all occurrences in one pass over the text
+    return rewrite_urls(text, url_mapping, skip_code=skip_code), url_mapping
+
+
+def _iter_line_blocks(infile, block_lines=DEFAULT_BLOCK_LINES,
+                      max_line_chars=DEFAULT_MAX_LINE_CHARS):
+    """
+    Yield lists of lines from `infile`, at most `block_lines` per block.
+
+    Lines longer than `max_line_chars` are split at the last whitespace so
+    no URL is cut in half and memory stays bounded.
+    """
+    block = []
+    carry = ''
+    while True:
+        line = infile.readline(max_line_chars)
+        if not line:
+            break
+        line = carry + line
+        carry = ''
+        if not line.endswith('\n') and len(line) >= max_line_chars:
+            cut = max(line.rfind(' '), line.rfind('\t')) + 1
+            if cut > 0:
+                line, carry = line[:cut], line[cut:]
+        block.append(line)
+        if len(block) >= block_lines:
+            yield block
+            block = []
+
+    if carry:
+        block.append(carry)
+    if block:
+        yield block
+
+
+class _FenceTracker:
+    """Track whether consecutive lines are inside a Markdown fenced code block."""
+
+    def __init__(self):
+        self.fence = None
+
+    def is_code(self, line):
+        match = FENCE_REGEX.match(line)
+        if self.fence is None:
+            if match:
+                self.fence = match.group(1)
+                return True
+            return False
+
+        if match and line.strip() == match.group(1) and \
+                match.group(1)[0] == self.fence[0] and len(match.group(1)) >= len(self.fence):
+            self.fence = None
+        return True
+
+
+def _split_segments(lines, fences=None):
+    """
+    Group lines into (text, is_code) runs.
+
+    Without a fence tracker the whole block is a single rewritable run.
+    """
+    if fences is None:
+        return [(''.join(lines), False)]
+
+    segments = []
+    current = []
+    current_is_code = False
+    for line in lines:
+        is_code = fences.is_code(line)
+        if current and is_code != current_is_code:
+            segments.append((''.join(current), current_is_code))
+            current = []
+        current.append(line)
+        current_is_code = is_code
+    if current:
+        segments.append((''.join(current), current_is_code))
+    return segments
+
+
+def shorten_urls_in_stream(infile, outfile, token, verbose=False, cache=None, workers=1,
+                           session=None, skip_code=False, mapping_file=None,
+                           block_lines=DEFAULT_BLOCK_LINES, canonicalize=True,
+                           skip_regex=SKIP_DOMAIN_REGEX):
+    """
+    Shorten URLs in a text stream block by block, in bounded memory.
+
+    Input is read in blocks of `block_lines` lines; each block's new URLs
+    are shortened together (concurrently when workers > 1) and the rewritten
+    block is written to `outfile` before the next block is read.
+
+    Args:
+        infile: Readable text file object
+        outfile: Writable text file object
+        token: Bitly API token
+        verbose: Print detailed information
+        cache: Optional ShortLinkCache consulted before calling Bitly
+        workers: Number of concurrent Bitly requests (1 = sequential)
+        session: Optional requests.Session shared by all requests
+        skip_code: Leave URLs inside Markdown code blocks and inline code untouched
+        mapping_file: Optional writable text file receiving one JSON object
+            ({"long_url": ..., "short_url": ...}) per newly shortened URL
+        block_lines: Number of lines processed per block
+        canonicalize: Normalize URLs before the cache lookup and Bitly call
+        skip_regex: Compiled host regex for links that are already short
+
+    Returns:
+        Dictionary with the number of lines read, new URLs looked up and
+        URLs shortened
+    """
+    stats = {'lines': 0, 'urls': 0, 'shortened': 0}
+    # Recently seen mappings, bounded so memory does not grow with the input
+    recent = {}
+    fences = _FenceTracker() if skip_code else None
+
+    own_session = session is None
+    if own_session:
+        session = create_session(workers)
+
+    try:
+        for lines in _iter_line_blocks(infile, block_lines):
+            stats['lines'] += len(lines)
+            segments = _split_segments(lines, fences)
+
+            unique_urls = []
+            for segment, is_code in segments:
+                if not is_code:
+                    unique_urls.extend(_find_unique_urls(segment, skip_code=skip_code))
+            unique_urls = list(dict.fromkeys(unique_urls))
+
+            known = {url: recent[url] for url in unique_urls if url in recent}
+            new_urls = [url for url in unique_urls if url not in known]
+            new_mapping = _resolve_mapping(new_urls, token, cache=cache, workers=workers,
+                                           session=session, verbose=verbose,
+                                           canonicalize=canonicalize, skip_regex=skip_regex)
+            if cache is not None:
+                cache.flush()
+
+            block_mapping = {**known, **new_mapping}
+            stats['urls'] += len(new_urls)
+            stats['shortened'] += len(new_mapping)
+
+            for segment, is_code in segments:
+                if is_code:
+                    outfile.write(segment)
+                else:
+                    outfile.write(rewrite_urls(segment, block_mapping, skip_code=skip_code))
+
+            if mapping_file is not None:
+                for url, shortened in new_mapping.items():
+                    mapping_file.write(json.dumps({'long_url': url, 'short_url': shortened},
+                                                  ensure_ascii=False) + '\n')
+                mapping_file.flush()
+
+            recent.update(new_mapping)
+            while len(recent) > DEFAULT_STREAM_MEMO:
+                del recent[next(iter(recent))]
+    finally:
+        if own_session:
+            session.close()
+
+    return stats
 
 
 def main():
     """Main function to handle command-line usage."""
-    if len(sys.argv) < 2:
-        print("Usage: python shorten_urls.py <text>", file=sys.stderr)
-        print("   or: python shorten_urls.py --verbose <text>", file=sys.stderr)
-        print("\nExample: python shorten_urls.py 'Check out https://example.com/page'", file=sys.stderr)
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description='Find and shorten all URLs in the given text using Bitly or a local store',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s 'Check out https://example.com/page'
+  %(prog)s --verbose 'Check out https://example.com/page'
+  %(prog)s --no-cache 'Check out https://example.com/page'
+  %(prog)s --input newsletter.md --output short.md --mapping-out links.jsonl
+  cat export.log | %(prog)s > short.log
+  %(prog)s --backend local --local-base-url https://s.example.com/ 'Check out https://example.com/page'
+        """
+    )
+    parser.add_argument('text', nargs='*',
+                        help='Text containing URLs to shorten (omit to read --input or stdin)')
+    parser.add_argument('--input', '-i',
+                        help="Stream text from FILE line by line ('-' for stdin)")
+    parser.add_argument('--output', '-o',
+                        help='Write the rewritten text to FILE instead of stdout (streaming mode)')
+    parser.add_argument('--mapping-out',
+                        help='Append long -> short mappings to FILE as JSON lines (streaming mode)')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                        help='Print progress, URL mapping and cache statistics')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always call Bitly, bypassing the on-disk short-link cache')
+    parser.add_argument('--cache-path', default=str(DEFAULT_CACHE_PATH),
+                        help=f'SQLite cache file (default: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_CACHE_TTL,
+                        help='Seconds before a cached short link is refreshed (default: 30 days)')
+    parser.add_argument('--cache-max-entries', type=int, default=DEFAULT_CACHE_MAX_ENTRIES,
+                        help='Maximum cached links before LRU eviction (default: 100000)')
+    parser.add_argument('--workers', '-w', type=int, default=DEFAULT_WORKERS,
+                        help=f'Concurrent Bitly requests (default: {DEFAULT_WORKERS}, 1 = sequential)')
+    parser.add_argument('--backend', choices=['bitly', 'local', 'auto'], default='bitly',
+                        help='bitly (default), local (self-hosted SQLite store), or auto '
+                             '(Bitly with fallback to local when Bitly keeps failing)')
+    parser.add_argument('--local-db', default=str(DEFAULT_LOCAL_DB_PATH),
+                        help=f'SQLite store for the local backend (default: {DEFAULT_LOCAL_DB_PATH})')
+    parser.add_argument('--local-base-url',
+                        help='Public base URL of redirect_server.py (default: SHORTENER_BASE_URL '
+                             f'or {DEFAULT_LOCAL_BASE_URL})')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help=f'Bitly requests per second per token (default: {DEFAULT_RATE})')
+    parser.add_argument('--burst', type=int, default=DEFAULT_BURST,
+                        help=f'Requests a token may burst before pacing (default: {DEFAULT_BURST})')
+    parser.add_argument('--no-canonicalize', action='store_true',
+                        help='Send URLs to Bitly exactly as written (keep utm_* and other tracking params)')
+    parser.add_argument('--skip-domain', action='append', default=[], metavar='DOMAIN',
+                        help='Extra already-short domain to leave untouched (repeatable; '
+                             'also read from SHORTENER_SKIP_DOMAINS)')
+    parser.add_argument('--skip-code', action='store_true',
+                        help='Leave URLs inside Markdown code blocks and inline code untouched')
 
-    # Check for verbose flag
-    verbose = False
-    text_index = 1
+    args = parser.parse_args()
+    verbose = args.verbose
 
-    if sys.argv[1] == '--verbose' or sys.argv[1] == '-v':
-        verbose = True
-        text_index = 2
-        if len(sys.argv) < 3:
-            print("Error: No text provided", file=sys.stderr)
-            sys.exit(1)
+    if args.text and args.input:
+        parser.error('pass either text arguments or --input, not both')
+    if not args.text and args.input is None:
+        if sys.stdin.isatty():
+            parser.error('no text provided (pass text, --input FILE, or pipe text to stdin)')
+        args.input = '-'
+
+    if args.input is not None:
+        return stream_main(args)
 
     # Get input text
-    text = ' '.join(sys.argv[text_index:])
+    text = ' '.join(args.text)
+
+    # Load Bitly token(s) and/or the local store
+    token = build_backend(args)
 
-    # Load Bitly token
-    token = load_bitly_token()
+    cache = None
+    if not args.no_cache:
+        cache = ShortLinkCache(args.cache_path, ttl=args.cache_ttl,
+                               max_entries=args.cache_max_entries)
 
     # Process text
-    modified_text, url_mapping = shorten_urls_in_text(text, token, verbose=verbose)
+    try:
+        modified_text, url_mapping = shorten_urls_in_text(
+            text, token, verbose=verbose, cache=cache, workers=args.workers,
+            skip_code=args.skip_code, canonicalize=not args.no_canonicalize,
+            skip_regex=skip_regex_from_args(args)
+        )
+    finally:
+        if cache is not None:
+            stats = cache.stats()
+            cache.close()
 
     # Output results
     print(modified_text)
@@ -180,6 +1308,93 @@ def main():
         print("\nURL Mapping:", file=sys.stderr)
         print(json.dumps(url_mapping, indent=2), file=sys.stderr)
 
+    if verbose and cache is not None:
+        print(f"\nCache: {stats['hits']} hit(s), {stats['misses']} miss(es), "
+              f"{stats['entries']} stored link(s)", file=sys.stderr)
+
+    if verbose:
+        print_backend_stats(token)
+
+
+def local_base_url_from_args(args):
+    load_dotenv()
+    return args.local_base_url or os.getenv('SHORTENER_BASE_URL') or DEFAULT_LOCAL_BASE_URL
+
+
+def build_backend(args):
+    """Create the shortening backend selected by --backend."""
+    if args.backend == 'local':
+        return LocalBackend(args.local_db, local_base_url_from_args(args))
+
+    pool = TokenPool(load_bitly_tokens(), rate=args.rate, burst=args.burst)
+    if args.backend == 'auto':
+        return CircuitBreakerBackend(BitlyBackend(pool),
+                                     LocalBackend(args.local_db, local_base_url_from_args(args)))
+    return pool
+
+
+def skip_regex_from_args(args):
+    """Build the already-short domain regex from defaults, env and --skip-domain."""
+    extra = os.getenv('SHORTENER_SKIP_DOMAINS', '').split(',') + args.skip_domain
+    if args.backend != 'bitly':
+        # Never re-shorten links that point at our own redirect server
+        extra.append(urlsplit(local_base_url_from_args(args)).hostname or '')
+    return compile_skip_domains(DEFAULT_SKIP_DOMAINS + tuple(d.strip() for d in extra if d.strip()))
+
+
+def print_backend_stats(backend):
+    """Print request counters of the shortening backend to stderr."""
+    if isinstance(backend, CircuitBreakerBackend):
+        stats = backend.stats()
+        print(f"Backend: circuit {stats['state']}, {stats['primary_calls']} "
+              f"{backend.primary.name} call(s), {stats['fallback_calls']} "
+              f"{backend.fallback.name} call(s)", file=sys.stderr)
+        backend = backend.primary
+    if isinstance(backend, BitlyBackend):
+        backend = backend.token
+    if isinstance(backend, TokenPool):
+        stats = backend.stats()
+        print(f"Bitly: {stats['requests']} request(s) over {stats['tokens']} token(s), "
+              f"{stats['rate_limited']} rate-limited", file=sys.stderr)
+    elif isinstance(backend, LocalBackend):
+        print(f"Local: {backend.stats()['links']} stored link(s)", file=sys.stderr)
+
+
+def stream_main(args):
+    """Run streaming mode: --input FILE or stdin to --output FILE or stdout."""
+    token = build_backend(args)
+
+    cache = None
+    if not args.no_cache:
+        cache = ShortLinkCache(args.cache_path, ttl=args.cache_ttl,
+                               max_entries=args.cache_max_entries)
+
+    infile = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8', newline='')
+    outfile = sys.stdout if not args.output else open(args.output, 'w', encoding='utf-8', newline='')
+    mapping_file = open(args.mapping_out, 'a', encoding='utf-8') if args.mapping_out else None
+
+    try:
+        stats = shorten_urls_in_stream(
+            infile, outfile, token, verbose=args.verbose, cache=cache, workers=args.workers,
+            skip_code=args.skip_code, mapping_file=mapping_file,
+            canonicalize=not args.no_canonicalize, skip_regex=skip_regex_from_args(args)
+        )
+    finally:
+        for f in (infile, outfile, mapping_file):
+            if f is not None and f not in (sys.stdin, sys.stdout):
+                f.close()
+        if cache is not None:
+            cache_stats = cache.stats()
+            cache.close()
+
+    if args.verbose:
+        print(f"\nProcessed {stats['lines']} line(s): {stats['urls']} URL(s) looked up, "
+              f"{stats['shortened']} shortened", file=sys.stderr)
+        if cache is not None:
+            print(f"Cache: {cache_stats['hits']} hit(s), {cache_stats['misses']} miss(es), "
+                  f"{cache_stats['entries']} stored link(s)", file=sys.stderr)
+        print_backend_stats(token)
+
 
 if __name__ == '__main__':
     main()
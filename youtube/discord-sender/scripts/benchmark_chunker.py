@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Chunker Benchmark
+Compares chunk_message() against the previous line-based splitter on the
+summary files in youtube/ (or files given on the command line) and a
+generated Markdown document: number of chunks (= Discord API calls),
+average fill, broken code fences and run time. Also runs inputs that once
+made the chunker loop forever. Exits with status 1 if the new chunker needs
+more chunks than its fill tolerance allows (legacy / MIN_FILL_RATIO),
+produces an oversized chunk or does not finish a regression case.
+"""
+
+import sys
+import math
+import time
+import random
+import argparse
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from send_message import FENCE_REGEX, MAX_MESSAGE_LENGTH, MIN_FILL_RATIO, chunk_message
+
+YOUTUBE_DIR = Path(__file__).resolve().parent.parent.parent
+REGRESSION_TIMEOUT = 10.0  # seconds
+
+# (name, message, max_length): fences too long to close and re-open within a chunk
+REGRESSION_CASES = [
+    ('1000-backtick fence', '`' * 1000 + '\n' + 'code line\n' * 400 + '`' * 1000, MAX_MESSAGE_LENGTH),
+    ('1990-backtick fence', '`' * 1990 + '\n' + 'code line\n' * 400 + '`' * 1990, MAX_MESSAGE_LENGTH),
+    ('fence opened by a split line', '```' + 'x' * 150, 50),
+]
+
+def legacy_chunk_message(message: str, max_length: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """The previous splitter, kept verbatim for comparison."""
+    if len(message) <= max_length:
+        return [message]
+
+    chunks: List[str] = []
+    current_chunk: List[str] = []
+    current_length = 0
+
+    for paragraph in message.split('\n'):
+        paragraph_with_newline = paragraph + '\n'
+        paragraph_length = len(paragraph_with_newline)
+
+        if paragraph_length > max_length:
+            start = 0
+            while start < len(paragraph):
+                end = start + max_length
+                chunks.append(paragraph[start:end])
+                start = end
+            continue
+
+        if current_length + paragraph_length > max_length:
+            chunks.append(''.join(current_chunk).rstrip())
+            current_chunk = [paragraph_with_newline]
+            current_length = paragraph_length
+        else:
+            current_chunk.append(paragraph_with_newline)
+            current_length += paragraph_length
+
+    if current_chunk:
+        chunks.append(''.join(current_chunk).rstrip())
+
+    return chunks
+
+def synthetic_markdown(sections: int = 40, seed: int = 0) -> str:
+    """Summary-like Markdown: headings, paragraphs, bullet lists and code blocks."""
+    rng = random.Random(seed)
+    words = ['summary', 'video', 'insight', 'data', 'chapter', 'speaker', 'growth', 'model',
+             'question', 'result', 'market', 'example', 'point', 'timeline', 'analysis']
+
+    def sentence() -> str:
+        return ' '.join(rng.choice(words) for _ in range(rng.randint(6, 18))).capitalize() + '.'
+
+    blocks = []
+    for i in range(sections):
+        blocks.append(f"## Section {i + 1}: {sentence()[:40]}")
+        blocks.append(' '.join(sentence() for _ in range(rng.randint(2, 8))))
+        blocks.append('\n'.join(f"- **{rng.choice(words)}**: {sentence()}" for _ in range(rng.randint(3, 8))))
+        if rng.random() < 0.3:
+            blocks.append('```python\n' + '\n'.join(f"value_{j} = {rng.randint(0, 999)}"
+                                                    for j in range(rng.randint(5, 40))) + '\n```')
+    return '\n\n'.join(blocks)
+
+def unbalanced_fences(chunks: List[str]) -> int:
+    """Count chunks that end inside an open code fence."""
+    broken = 0
+    for chunk in chunks:
+        open_fences = sum(1 for line in chunk.split('\n') if FENCE_REGEX.match(line))
+        broken += open_fences % 2
+    return broken
+
+def run_with_timeout(func: Callable[[], List[str]], timeout: float) -> Optional[List[str]]:
+    """Result of func(), or None if it has not returned after `timeout` seconds."""
+    result: List[List[str]] = []
+    worker = threading.Thread(target=lambda: result.append(func()), daemon=True)
+    worker.start()
+    worker.join(timeout)
+    return result[0] if result else None
+
+def measure(chunker: Callable[[str, int], List[str]], text: str, max_length: int, repeat: int):
+    best = float('inf')
+    chunks: List[str] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = chunker(text, max_length)
+        best = min(best, time.perf_counter() - start)
+    fill = sum(len(chunk) for chunk in chunks) / (len(chunks) * max_length) if chunks else 0.0
+    oversized = sum(1 for chunk in chunks if len(chunk) > max_length)
+    return len(chunks), fill, unbalanced_fences(chunks), best, oversized
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Discord message chunkers')
+    parser.add_argument('files', nargs='*', help='Markdown files (default: youtube/**/summary_*.md)')
+    parser.add_argument('--max-length', type=int, default=MAX_MESSAGE_LENGTH,
+                        help=f'Chunk size limit (default: {MAX_MESSAGE_LENGTH})')
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 10, 100],
+                        help='Concatenate each file N times to check linear scaling (default: 1 10 100)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per case, best time is kept')
+    args = parser.parse_args()
+
+    files = [Path(f) for f in args.files] or sorted(YOUTUBE_DIR.glob('**/summary_*.md'))
+    cases = [(path.name, path.read_text(encoding='utf-8')) for path in files]
+    cases.append(('(synthetic markdown)', synthetic_markdown()))
+
+    print(f"{'file':<28} {'x':>4} {'chars':>9} | {'legacy':>6} {'fill':>5} {'fence':>5} {'ms':>8} | "
+          f"{'new':>6} {'fill':>5} {'fence':>5} {'ms':>8}")
+    print("-" * 104)
+
+    failures = []
+    for name, text in cases:
+        for scale in args.scale:
+            scaled = '\n'.join([text] * scale)
+            old = measure(legacy_chunk_message, scaled, args.max_length, args.repeat)
+            new = measure(chunk_message, scaled, args.max_length, args.repeat)
+            print(f"{name[:28]:<28} {scale:>4} {len(scaled):>9} | "
+                  f"{old[0]:>6} {old[1]:>5.0%} {old[2]:>5} {old[3] * 1000:>8.2f} | "
+                  f"{new[0]:>6} {new[1]:>5.0%} {new[2]:>5} {new[3] * 1000:>8.2f}")
+            if new[0] > math.ceil(old[0] / MIN_FILL_RATIO):
+                failures.append(f"{name} x{scale}: {new[0]} chunks, legacy needs {old[0]}")
+            if new[4]:
+                failures.append(f"{name} x{scale}: {new[4]} chunk(s) over {args.max_length} characters")
+
+    print()
+    for name, text, max_length in REGRESSION_CASES:
+        chunks = run_with_timeout(lambda: chunk_message(text, max_length), REGRESSION_TIMEOUT)
+        if chunks is None:
+            print(f"{name:<28} did not finish in {REGRESSION_TIMEOUT:.0f}s")
+            failures.append(f"{name}: did not finish in {REGRESSION_TIMEOUT:.0f}s")
+            continue
+        longest = max(len(chunk) for chunk in chunks)
+        print(f"{name:<28} {len(chunks):>4} chunks, longest {longest}/{max_length}")
+        if longest > max_length:
+            failures.append(f"{name}: chunk of {longest} characters, limit {max_length}")
+
+    if failures:
+        print("\nFAILED:", file=sys.stderr)
+        for failure in failures:
+            print(f"  {failure}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -5,15 +5,38 @@ Sends messages to a Discord channel using the Discord API
 """
 
 import os
+import re
 import sys
+import json
 import time
+import asyncio
+import sqlite3
+import argparse
+import threading
+import statistics
 import requests
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 from pathlib import Path
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 
 MAX_MESSAGE_LENGTH = 2000
 DEFAULT_RETRY_AFTER = 2.0
 MAX_RETRIES = 3
+REQUEST_TIMEOUT = 30
+GLOBAL_RATE_LIMIT = 50  # requests per second across all routes (Discord default)
+PREVIEW_LENGTH = 1500
+DEFAULT_ATTACHMENT_NAME = "message.md"
+DEFAULT_OUTBOX_PATH = Path.home() / '.cache' / 'discord-sender' / 'outbox.sqlite3'
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_BACKOFF_BASE = 5.0  # seconds, doubled after every failed attempt
+OUTBOX_BACKOFF_MAX = 600.0
+OUTBOX_LEASE = 120.0  # seconds a claimed message is reserved; renewed after every chunk
+DEFAULT_FANOUT_CONCURRENCY = 8
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_session_pool_size = DEFAULT_POOLSIZE
 
 def load_env_file(env_path: Path) -> Dict[str, str]:
     """Load key=value pairs from a .env file."""
@@ -48,48 +71,342 @@ def find_env_vars() -> Dict[str, str]:
         aggregated.update(load_env_file(path))
     return aggregated
 
+HEADING_REGEX = re.compile(r'^(#{1,6}\s|-{3,}\s*$|\*{3,}\s*$)')
+BULLET_REGEX = re.compile(r'^\s*([-*+•]|\d+[.)])\s')
+FENCE_REGEX = re.compile(r'^\s*(`{3,}|~{3,})')
+# Spans that must stay on one line: [label](url), [label] url, <url> and bare URLs
+LINK_REGEX = re.compile(r'\[[^\]]*\]\s*(\([^)\s]*\)|<?https?://\S+)|<?https?://\S+')
+# A line that is a link (or a labelled link) for the text just before it
+LINK_START_REGEX = re.compile(r'^\s*(<?https?://|\([^)\s]*\)|\[[^\]]*\]\s*(\(|<?https?://))')
+SENTENCE_END_REGEX = re.compile(r'[.!?。](?=\s)')
+MAX_REOPEN_LENGTH = 100
+MIN_CODE_PAYLOAD = 20  # code characters a re-opened fence must leave room for
+MIN_FILL_RATIO = 0.85
+
+# Split preference for the line that would start the next chunk
+SPLIT_HEADING = 3
+SPLIT_PARAGRAPH = 2
+SPLIT_BULLET = 1
+SPLIT_LINE = 0
+SPLIT_IN_CODE = -1
+SPLIT_LINK = -2  # a link continuing the line before it
+
+def _piece_end(line: str, start: int, limit: int) -> int:
+    """End of the next piece of `line` from `start` within `limit` characters, preferring whitespace."""
+    end = start + limit
+    if end >= len(line):
+        return len(line)
+    space = line.rfind(' ', start + limit // 2, end)
+    return space + 1 if space > start else end
+
+def _split_score(line: str, previous: Optional[str], fence: Optional[str]) -> int:
+    """How good a chunk boundary just before `line` is."""
+    if fence is not None:
+        return SPLIT_IN_CODE
+    if HEADING_REGEX.match(line):
+        return SPLIT_HEADING
+    if not line.strip() or (previous is not None and not previous.strip()):
+        return SPLIT_PARAGRAPH
+    if BULLET_REGEX.match(line):
+        return SPLIT_BULLET
+    if previous is not None and LINK_START_REGEX.match(line):
+        return SPLIT_LINK
+    return SPLIT_LINE
+
+def _fill_cut(line: str, room: int) -> int:
+    """
+    Where to cut `line` so its start fits in `room` characters, or -1.
+
+    Prose is cut at whitespace, bullets only at the end of a sentence;
+    headings and fence lines are never cut, and neither is a link or the
+    label in front of it.
+    """
+    if room <= 0 or FENCE_REGEX.match(line) or HEADING_REGEX.match(line):
+        return -1
+    links = [match.span() for match in LINK_REGEX.finditer(line)]
+
+    def allowed(cut: int) -> bool:
+        return cut > 0 and not any(start <= cut < end for start, end in links)
+
+    if BULLET_REGEX.match(line):
+        cuts = reversed([match.end() for match in SENTENCE_END_REGEX.finditer(line, 0, room)])
+    else:
+        cuts = (i for i in range(min(room, len(line) - 1), 0, -1) if line[i] == ' ')
+    return next((cut for cut in cuts if allowed(cut)), -1)
+
 def chunk_message(message: str, max_length: int = MAX_MESSAGE_LENGTH) -> List[str]:
-    """Split a message into Discord-safe chunks."""
+    """Split a message into Discord-safe chunks, in order (see iter_chunks())."""
     if len(message) <= max_length:
         return [message]
+    return list(iter_chunks(message.split('\n'), max_length))
 
-    chunks: List[str] = []
-    current_chunk: List[str] = []
-    current_length = 0
-
-    for paragraph in message.split('\n'):
-        paragraph_with_newline = paragraph + '\n'
-        paragraph_length = len(paragraph_with_newline)
-
-        if paragraph_length > max_length:
-            # Fallback: split paragraph itself into hard chunks
-            start = 0
-            while start < len(paragraph):
-                end = start + max_length
-                chunks.append(paragraph[start:end])
-                start = end
-            continue
+def iter_chunks(lines: Iterable[str], max_length: int = MAX_MESSAGE_LENGTH) -> Iterator[str]:
+    """
+    Yield Discord-safe chunks from an iterable of lines, in order.
 
-        if current_length + paragraph_length > max_length:
-            chunks.append(''.join(current_chunk).rstrip())
-            current_chunk = [paragraph_with_newline]
-            current_length = paragraph_length
-        else:
-            current_chunk.append(paragraph_with_newline)
-            current_length += paragraph_length
+    Lines are packed greedily in a single pass. When a chunk is full it is
+    cut at the best boundary (heading > blank line > bullet) that still
+    leaves it at least MIN_FILL_RATIO full. Without one it is cut after the
+    last line that fits, and the room left is filled with the start of the
+    next line: prose is split at whitespace, a bullet only at the end of a
+    sentence, and headings, code and links are never split (a line that is
+    the link for the text before it is not split off either). Code fences split
+    across chunks are closed at the end of one chunk and re-opened (with the
+    same language tag) at the start of the next; a fence whose markers leave
+    less than MIN_CODE_PAYLOAD characters of room is carried over as plain text.
+
+    Each chunk is yielded as soon as it is complete, so a chunk can be sent
+    while later lines are still being read. Trailing newlines on the input
+    lines are ignored.
+    """
+    chunks: List[str] = []  # completed chunks not yet yielded
+    # Entries: (line, split score, open fence line before this line or None)
+    current: List[Tuple[str, int, Optional[str]]] = []
+    current_length = -1  # length of '\n'.join(lines)
+    fence: Optional[str] = None  # opening line of the fence still open, if any
+    fence_marker = ''
+    # Open fence line -> (re-opening line or None, closing text)
+    markers: Dict[Optional[str], Tuple[Optional[str], str]] = {None: (None, '')}
+
+    def fence_markers(open_fence: Optional[str]) -> Tuple[Optional[str], str]:
+        if open_fence not in markers:
+            marker = FENCE_REGEX.match(open_fence).group(1)
+            candidates = [open_fence] if len(open_fence) <= MAX_REOPEN_LENGTH else []
+            candidates.append(marker)
+            markers[open_fence] = (None, '')
+            for reopen in candidates:
+                if len(reopen) + len(marker) + 2 + MIN_CODE_PAYLOAD <= max_length and \
+                        len(open_fence) + len(marker) + 1 <= max_length:
+                    markers[open_fence] = (reopen, '\n' + marker)
+                    break
+        return markers[open_fence]
+
+    def closing(open_fence: Optional[str]) -> str:
+        return fence_markers(open_fence)[1]
+
+    def reopening(open_fence: Optional[str]) -> Optional[str]:
+        return fence_markers(open_fence)[0]
+
+    def emit(lines: List[str], open_fence: Optional[str]) -> None:
+        if open_fence is None:
+            while lines and not lines[-1].strip():
+                lines.pop()
+        if lines:
+            chunks.append('\n'.join(lines) + closing(open_fence))
+
+    def split_current() -> None:
+        nonlocal current, current_length
+        last_k, last_size = 0, 0  # last line that fits
+        plain_k, plain_size = 0, 0  # last one that does not part a link from its label
+        best_k, best_score, best_size = 0, SPLIT_LINE, 0  # preferred boundary
+        prefix = -1
+        for k in range(1, len(current)):
+            prefix += len(current[k - 1][0]) + 1
+            size = prefix + len(closing(current[k][2]))
+            if size > max_length:
+                break
+            score = current[k][1]
+            last_k, last_size = k, size
+            if score != SPLIT_LINK:
+                plain_k, plain_size = k, size
+            if size >= max_length * MIN_FILL_RATIO and score > SPLIT_LINE and score >= best_score:
+                best_k, best_score, best_size = k, score, size
+
+        fill = not best_k
+        if fill:
+            best_k, best_size = (plain_k, plain_size) if plain_k else (last_k, last_size)
+
+        head = [line for line, _, _ in current[:max(best_k, 1)]]
+        rest = current[max(best_k, 1):]
+
+        # Fill the room left with the start of the next line
+        if fill and rest and rest[0][2] is None:
+            line, score, open_fence = rest[0]
+            cut = _fill_cut(line, max_length - best_size - 1)
+            if cut > 0:
+                head.append(line[:cut].rstrip())
+                rest[0] = (line[cut:].lstrip(), SPLIT_LINE, open_fence)
+
+        emit(head, rest[0][2] if rest else None)
+        reopen = reopening(rest[0][2]) if rest else None
+        if reopen is not None:
+            rest.insert(0, (reopen, SPLIT_IN_CODE, None))
+        elif not rest or rest[0][2] is None:
+            while rest and not rest[0][0].strip():
+                rest.pop(0)
+        remaining = sum(len(line) for line, _, _ in rest) + len(rest) - 1
+        if remaining >= current_length and reopen is not None:
+            # Re-opening would not shrink the chunk: carry on without it
+            rest.pop(0)
+            remaining -= len(reopen) + 1
+        current = rest
+        current_length = remaining
+
+    previous: Optional[str] = None
+    for raw_line in lines:
+        raw_line = raw_line.rstrip('\n')
+        start = 0
+        while True:
+            # Re-measured per piece: a piece can open a fence that the rest must make room for
+            limit = max_length
+            if reopening(fence) is not None:
+                limit -= len(reopening(fence)) + len(closing(fence)) + 1
+            end = _piece_end(raw_line, start, limit)
+            line, start = raw_line[start:end], end
+            current.append((line, _split_score(line, previous, fence), fence))
+            current_length += len(line) + 1
+            previous = line
+
+            match = FENCE_REGEX.match(line)
+            if match:
+                marker = match.group(1)
+                if fence is None:
+                    fence, fence_marker = line.strip(), marker
+                elif line.strip() == marker and marker[0] == fence_marker[0] and \
+                        len(marker) >= len(fence_marker):
+                    fence, fence_marker = None, ''
+
+            while len(current) > 1 and current_length + len(closing(fence)) > max_length:
+                split_current()
+            if start >= len(raw_line):
+                break
+
+        yield from chunks
+        chunks.clear()
+
+    emit([line for line, _, _ in current], None)
+    yield from chunks
+
+def get_session(pool_size: Optional[int] = None) -> requests.Session:
+    """
+    Return the shared keep-alive session used for all Discord requests.
+
+    pool_size grows its connection pool to keep that many connections open,
+    e.g. one per concurrent worker thread; the pool never shrinks.
+    """
+    global _session, _session_pool_size
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+        if pool_size is not None and pool_size > _session_pool_size:
+            adapter = HTTPAdapter(pool_maxsize=pool_size)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+            _session_pool_size = pool_size
+        return _session
+
+class RateLimiter:
+    """
+    Proactive pacing from Discord's rate-limit headers.
+
+    Each route is mapped to the bucket named by `X-RateLimit-Bucket`; bucket
+    state (`X-RateLimit-Remaining`, `X-RateLimit-Reset-After`) is tracked per
+    bucket and major parameter (channel), so a request waits for its bucket to
+    reset instead of provoking a 429. The global limit is paced separately.
+    """
+
+    def __init__(self, global_rate: float = GLOBAL_RATE_LIMIT):
+        self.global_rate = global_rate
+        self._lock = threading.Lock()
+        self._route_buckets: Dict[str, str] = {}
+        self._buckets: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self._global_blocked_until = 0.0
+        self._global_sent: List[float] = []
+
+    @staticmethod
+    def _major_parameter(route: str) -> str:
+        match = re.search(r'/(channels|guilds|webhooks)/(\d+)', route)
+        return match.group(2) if match else ''
+
+    def _bucket_key(self, route: str) -> Tuple[str, str]:
+        return (self._route_buckets.get(route, route), self._major_parameter(route))
+
+    def _delay(self, route: str, now: float) -> float:
+        delay = max(self._global_blocked_until - now, 0.0)
+
+        # Global limit: at most `global_rate` requests in any one-second window
+        self._global_sent = [sent for sent in self._global_sent if now - sent < 1.0]
+        if len(self._global_sent) >= self.global_rate:
+            delay = max(delay, self._global_sent[0] + 1.0 - now)
+
+        bucket = self._buckets.get(self._bucket_key(route))
+        if bucket and bucket['remaining'] <= 0 and bucket['reset_at'] > now:
+            delay = max(delay, bucket['reset_at'] - now)
+        return delay
 
-    if current_chunk:
-        chunks.append(''.join(current_chunk).rstrip())
+    def acquire(self, route: str) -> None:
+        """Block until a request on `route` can be sent without hitting a limit."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                delay = self._delay(route, now)
+                if delay <= 0:
+                    self._global_sent.append(now)
+                    bucket = self._buckets.get(self._bucket_key(route))
+                    if bucket and bucket['reset_at'] > now:
+                        bucket['remaining'] -= 1
+                    return
+            time.sleep(delay)
+
+    def update(self, route: str, headers) -> None:
+        """Record bucket state from a response's X-RateLimit-* headers."""
+        bucket_id = headers.get('X-RateLimit-Bucket')
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset_after = headers.get('X-RateLimit-Reset-After')
+
+        with self._lock:
+            if bucket_id:
+                self._route_buckets[route] = bucket_id
+            if remaining is None or reset_after is None:
+                return
+            try:
+                self._buckets[self._bucket_key(route)] = {
+                    'remaining': int(remaining),
+                    'reset_at': time.monotonic() + float(reset_after),
+                }
+            except ValueError:
+                pass
+
+    def rate_limited(self, route: str, response: requests.Response) -> float:
+        """Apply a 429 response and return the delay Discord asked for."""
+        body: Dict = {}
+        try:
+            body = response.json()
+        except ValueError:
+            pass
+
+        retry_after = body.get('retry_after') or response.headers.get('Retry-After')
+        delay = float(retry_after) if retry_after else DEFAULT_RETRY_AFTER
+        is_global = body.get('global') or response.headers.get('X-RateLimit-Global')
+
+        with self._lock:
+            if is_global:
+                self._global_blocked_until = time.monotonic() + delay
+            else:
+                self._buckets[self._bucket_key(route)] = {
+                    'remaining': 0,
+                    'reset_at': time.monotonic() + delay,
+                }
+        return delay
 
-    return chunks
+_rate_limiter = RateLimiter()
 
-def post_with_retry(url: str, headers: Dict[str, str], content: str) -> Dict[str, any]:
-    """Send a single message chunk with retry logic for rate limits."""
-    payload = {"content": content}
+def _post_with_retry(
+    url: str,
+    headers: Dict[str, str],
+    session: Optional[requests.Session] = None,
+    limiter: Optional[RateLimiter] = None,
+    **request_kwargs,
+) -> Dict[str, any]:
+    """POST to Discord, paced by the rate limiter and retried on 429."""
+    session = session or get_session()
+    limiter = limiter or _rate_limiter
     attempt = 0
 
     while attempt < MAX_RETRIES:
-        response = requests.post(url, headers=headers, json=payload)
+        limiter.acquire(url)
+        response = session.post(url, headers=headers, timeout=REQUEST_TIMEOUT, **request_kwargs)
+        limiter.update(url, response.headers)
 
         if response.status_code in (200, 201):
             return {
@@ -98,10 +415,8 @@ def post_with_retry(url: str, headers: Dict[str, str], content: str) -> Dict[str
             }
 
         if response.status_code == 429:
-            retry_after = response.headers.get('Retry-After')
-            delay = float(retry_after) if retry_after else DEFAULT_RETRY_AFTER
+            delay = limiter.rate_limited(url, response)
             print(f"⚠️  Rate limited. Retrying in {delay} seconds...", file=sys.stderr)
-            time.sleep(delay)
             attempt += 1
             continue
 
@@ -116,10 +431,50 @@ def post_with_retry(url: str, headers: Dict[str, str], content: str) -> Dict[str
         "error": "Exceeded maximum retry attempts due to rate limiting."
     }
 
-def send_discord_message(message: str, channel_id: Optional[str] = None, token: Optional[str] = None):
+def post_with_retry(
+    url: str,
+    headers: Dict[str, str],
+    content: str,
+    session: Optional[requests.Session] = None,
+    limiter: Optional[RateLimiter] = None,
+) -> Dict[str, any]:
     """
-    Send a (possibly long) message to Discord by chunking it and respecting rate limits.
+    Send a single message chunk, paced by the rate limiter.
+
+    Requests wait for their rate-limit bucket before being sent; a 429 that
+    still slips through is retried after the delay Discord reports.
     """
+    return _post_with_retry(url, headers, session, limiter, json={"content": content})
+
+def post_attachment_with_retry(
+    url: str,
+    headers: Dict[str, str],
+    content: str,
+    filename: str,
+    data: bytes,
+    session: Optional[requests.Session] = None,
+    limiter: Optional[RateLimiter] = None,
+) -> Dict[str, any]:
+    """Send `content` plus one file attachment as a single multipart request."""
+    payload = {
+        "content": content,
+        "attachments": [{"id": 0, "filename": filename}],
+    }
+    # requests sets the multipart Content-Type (with boundary) itself
+    headers = {key: value for key, value in headers.items() if key.lower() != 'content-type'}
+    files = {
+        "payload_json": (None, json.dumps(payload), "application/json"),
+        "files[0]": (filename, data, "text/markdown; charset=utf-8"),
+    }
+    return _post_with_retry(url, headers, session, limiter, files=files)
+
+def build_preview(message: str, filename: str, max_length: int = PREVIEW_LENGTH) -> str:
+    """First Markdown-aware chunk of `message` plus a pointer to the attachment."""
+    preview = chunk_message(message, max_length)[0]
+    return f"{preview}\n\n📎 Full message attached as `{filename}` ({len(message):,} chars)"
+
+def resolve_credentials(channel_id: Optional[str] = None, token: Optional[str] = None) -> Tuple[str, str]:
+    """Fill in channel ID and bot token from .env files or the environment."""
     env_vars = find_env_vars()
 
     if not token:
@@ -132,17 +487,60 @@ def send_discord_message(message: str, channel_id: Optional[str] = None, token:
     if not channel_id:
         raise ValueError("Discord channel ID not found. Please set DISCORD_CHANNEL_ID in .env or environment.")
 
+    return channel_id, token
+
+def send_discord_message(
+    message: str,
+    channel_id: Optional[str] = None,
+    token: Optional[str] = None,
+    attachment_threshold: Optional[int] = None,
+    filename: str = DEFAULT_ATTACHMENT_NAME,
+):
+    """
+    Send a (possibly long) message to Discord by chunking it and respecting rate limits.
+
+    If `attachment_threshold` is set and the message would need more chunks
+    than that, a short preview is posted with the full Markdown attached as
+    `filename` instead, so the whole message costs a single request.
+    """
+    channel_id, token = resolve_credentials(channel_id, token)
+    return deliver_chunks(message, chunk_message(message), channel_id, token,
+                          attachment_threshold=attachment_threshold, filename=filename)
+
+def deliver_chunks(
+    message: str,
+    chunks: List[str],
+    channel_id: str,
+    token: str,
+    attachment_threshold: Optional[int] = None,
+    filename: str = DEFAULT_ATTACHMENT_NAME,
+    label: str = "",
+):
+    """Post pre-chunked `message` to one channel; see send_discord_message()."""
     url = f"https://discord.com/api/v10/channels/{channel_id}/messages"
     headers = {
         "Authorization": f"Bot {token}",
         "Content-Type": "application/json"
     }
 
-    chunks = chunk_message(message)
+    if attachment_threshold is not None and len(chunks) > attachment_threshold:
+        print(f"📎 {label}Sending preview with {filename} attached "
+              f"(instead of {len(chunks)} chunks)", file=sys.stderr)
+        result = post_attachment_with_retry(
+            url, headers, build_preview(message, filename), filename, message.encode('utf-8')
+        )
+        if not result.get("success"):
+            return result
+        return {
+            "success": True,
+            "message": f"Sent preview with {filename} attached (1 request instead of {len(chunks)} chunk(s)).",
+            "responses": [result["response"]]
+        }
+
     responses = []
 
     for index, chunk in enumerate(chunks, start=1):
-        print(f"⏩ Sending chunk {index}/{len(chunks)} ({len(chunk)} chars)", file=sys.stderr)
+        print(f"⏩ {label}Sending chunk {index}/{len(chunks)} ({len(chunk)} chars)", file=sys.stderr)
         result = post_with_retry(url, headers, chunk)
         if not result.get("success"):
             result["failed_chunk_index"] = index
@@ -155,18 +553,450 @@ def send_discord_message(message: str, channel_id: Optional[str] = None, token:
         "responses": responses
     }
 
+def send_discord_stream(
+    lines: Iterable[str],
+    channel_id: Optional[str] = None,
+    token: Optional[str] = None,
+):
+    """
+    Send text read line by line (e.g. from a file or stdin) to Discord.
+
+    Chunks are posted as soon as the chunker completes them, so sending
+    starts before the input has been read to the end and memory stays at
+    about one chunk. Returns the same result dict as send_discord_message().
+    """
+    channel_id, token = resolve_credentials(channel_id, token)
+
+    url = f"https://discord.com/api/v10/channels/{channel_id}/messages"
+    headers = {
+        "Authorization": f"Bot {token}",
+        "Content-Type": "application/json"
+    }
+
+    responses = []
+    for index, chunk in enumerate(iter_chunks(lines), start=1):
+        print(f"⏩ Sending chunk {index} ({len(chunk)} chars)", file=sys.stderr)
+        result = post_with_retry(url, headers, chunk)
+        if not result.get("success"):
+            result["failed_chunk_index"] = index
+            return result
+        responses.append(result["response"])
+
+    if not responses:
+        return {"success": False, "error": "Input is empty"}
+
+    return {
+        "success": True,
+        "message": f"Sent {len(responses)} chunk(s) successfully.",
+        "responses": responses
+    }
+
+async def asend_discord_messages(
+    message: str,
+    channel_ids: List[str],
+    token: Optional[str] = None,
+    attachment_threshold: Optional[int] = None,
+    filename: str = DEFAULT_ATTACHMENT_NAME,
+    max_concurrency: int = DEFAULT_FANOUT_CONCURRENCY,
+) -> Dict[str, Dict]:
+    """
+    Post the same message to several channels concurrently.
+
+    The message is chunked once. Each channel's chunks are sent in order in a
+    worker thread (at most `max_concurrency` channels at a time) over the
+    shared session, and every request still goes through the shared
+    RateLimiter, so per-channel buckets and the global limit are respected.
+
+    Returns:
+        {channel_id: result} where each result has the same shape as
+        send_discord_message()'s return value.
+    """
+    _, token = resolve_credentials(channel_ids[0] if channel_ids else None, token)
+    chunks = chunk_message(message)
+    semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+
+    async def send_one(channel_id: str) -> Dict[str, any]:
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(
+                    deliver_chunks, message, chunks, channel_id, token,
+                    attachment_threshold, filename, f"[{channel_id}] "
+                )
+            except requests.exceptions.RequestException as e:
+                return {"success": False, "error": f"Network error: {e}"}
+
+    channel_ids = list(dict.fromkeys(str(channel_id) for channel_id in channel_ids))
+    results = await asyncio.gather(*(send_one(channel_id) for channel_id in channel_ids))
+    return dict(zip(channel_ids, results))
+
+def send_to_channels(message: str, channel_ids: List[str], **kwargs) -> Dict[str, Dict]:
+    """Synchronous wrapper around asend_discord_messages()."""
+    return asyncio.run(asend_discord_messages(message, channel_ids, **kwargs))
+
+class Outbox:
+    """
+    Durable SQLite spool of messages waiting to be delivered to Discord.
+
+    A message is chunked when it is enqueued and `next_chunk` is advanced
+    after every chunk Discord accepts, so a worker that crashes mid-message
+    resumes with the first unsent chunk (a chunk in flight at the moment of
+    the crash may be sent twice). Messages for the same channel are
+    delivered in order.
+
+    A claimed message is leased for OUTBOX_LEASE seconds (renewed after
+    every chunk), so several workers may share one outbox: a message being
+    delivered is never taken over, and its channel waits until it is done.
+    A message whose lease ran out (its worker died) is claimed again.
+    """
+
+    def __init__(self, path: Path = DEFAULT_OUTBOX_PATH):
+        self.path = Path(path)
+        if str(path) != ':memory:':
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS outbox ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' channel_id TEXT NOT NULL,'
+            ' chunks TEXT NOT NULL,'
+            ' attachment TEXT,'
+            ' filename TEXT,'
+            ' next_chunk INTEGER NOT NULL DEFAULT 0,'
+            " status TEXT NOT NULL DEFAULT 'pending',"
+            ' attempts INTEGER NOT NULL DEFAULT 0,'
+            ' last_error TEXT,'
+            ' created_at REAL NOT NULL,'
+            ' next_attempt_at REAL NOT NULL,'
+            ' lease_until REAL,'
+            ' sent_at REAL)'
+        )
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(outbox)')}
+        if 'lease_until' not in columns:
+            self.conn.execute('ALTER TABLE outbox ADD COLUMN lease_until REAL')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (status, channel_id, id)')
+        self.conn.commit()
+
+    def enqueue(
+        self,
+        message: str,
+        channel_id: str,
+        attachment_threshold: Optional[int] = None,
+        filename: str = DEFAULT_ATTACHMENT_NAME,
+    ) -> int:
+        """Spool a message for `channel_id`; returns the outbox row ID."""
+        chunks = chunk_message(message)
+        attachment = None
+        if attachment_threshold is not None and len(chunks) > attachment_threshold:
+            chunks = [build_preview(message, filename)]
+            attachment = message
+
+        now = time.time()
+        with self._lock:
+            cursor = self.conn.execute(
+                'INSERT INTO outbox (channel_id, chunks, attachment, filename, created_at, next_attempt_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (str(channel_id), json.dumps(chunks, ensure_ascii=False), attachment, filename, now, now)
+            )
+            self.conn.commit()
+            return cursor.lastrowid
+
+    def recover(self) -> int:
+        """Return messages whose worker died mid-delivery (lease expired) to the queue."""
+        with self._lock:
+            cursor = self.conn.execute(
+                "UPDATE outbox SET status = 'pending', lease_until = NULL "
+                "WHERE status = 'sending' AND (lease_until IS NULL OR lease_until <= ?)",
+                (time.time(),)
+            )
+            self.conn.commit()
+            return cursor.rowcount
+
+    @staticmethod
+    def _is_due(status: str, next_attempt_at: float, lease_until: Optional[float], now: float) -> bool:
+        if status == 'sending':
+            return lease_until is None or lease_until <= now
+        return next_attempt_at <= now
+
+    def ready_channels(self) -> List[str]:
+        """Channels whose oldest undelivered message can be claimed now."""
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT o.channel_id, o.status, o.next_attempt_at, o.lease_until FROM outbox o '
+                'JOIN (SELECT MIN(id) AS id FROM outbox '
+                "      WHERE status IN ('pending', 'sending') GROUP BY channel_id) head "
+                'ON o.id = head.id'
+            ).fetchall()
+        now = time.time()
+        return [channel_id for channel_id, status, due, lease in rows if self._is_due(status, due, lease, now)]
+
+    def claim(self, channel_id: str) -> Optional[Dict]:
+        """Lease the oldest undelivered message of a channel and return it (None if not due)."""
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT id, chunks, attachment, filename, next_chunk, attempts, next_attempt_at, status, '
+                "lease_until FROM outbox WHERE status IN ('pending', 'sending') AND channel_id = ? "
+                'ORDER BY id LIMIT 1',
+                (channel_id,)
+            ).fetchone()
+            if row is None or not self._is_due(row[7], row[6], row[8], now):
+                return None
+            # Conditional update, so a worker in another process cannot claim it too
+            cursor = self.conn.execute(
+                "UPDATE outbox SET status = 'sending', lease_until = ? "
+                'WHERE id = ? AND status = ? AND lease_until IS ?',
+                (now + OUTBOX_LEASE, row[0], row[7], row[8])
+            )
+            self.conn.commit()
+            if cursor.rowcount == 0:
+                return None
+        return {
+            'id': row[0],
+            'channel_id': channel_id,
+            'chunks': json.loads(row[1]),
+            'attachment': row[2],
+            'filename': row[3],
+            'next_chunk': row[4],
+            'attempts': row[5],
+        }
+
+    def chunk_sent(self, message_id: int, next_chunk: int) -> None:
+        with self._lock:
+            self.conn.execute('UPDATE outbox SET next_chunk = ?, lease_until = ? WHERE id = ?',
+                              (next_chunk, time.time() + OUTBOX_LEASE, message_id))
+            self.conn.commit()
+
+    def delivered(self, message_id: int) -> None:
+        with self._lock:
+            self.conn.execute(
+                "UPDATE outbox SET status = 'sent', sent_at = ?, last_error = NULL, lease_until = NULL WHERE id = ?",
+                (time.time(), message_id)
+            )
+            self.conn.commit()
+
+    def failed(self, message_id: int, attempts: int, error: str) -> None:
+        """Schedule a retry with exponential backoff, or give up after OUTBOX_MAX_ATTEMPTS."""
+        status = 'failed' if attempts >= OUTBOX_MAX_ATTEMPTS else 'pending'
+        delay = min(OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1), OUTBOX_BACKOFF_MAX)
+        with self._lock:
+            self.conn.execute(
+                'UPDATE outbox SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ?, lease_until = NULL '
+                'WHERE id = ?',
+                (status, attempts, error, time.time() + delay, message_id)
+            )
+            self.conn.commit()
+
+    def stats(self, latency_window: int = 1000) -> Dict[str, any]:
+        """Queue depth per status, oldest pending age and recent delivery latency."""
+        with self._lock:
+            counts = dict(self.conn.execute('SELECT status, COUNT(*) FROM outbox GROUP BY status').fetchall())
+            oldest = self.conn.execute(
+                "SELECT MIN(created_at) FROM outbox WHERE status IN ('pending', 'sending')"
+            ).fetchone()[0]
+            latencies = [row[0] for row in self.conn.execute(
+                "SELECT sent_at - created_at FROM outbox WHERE status = 'sent' "
+                'ORDER BY sent_at DESC LIMIT ?', (latency_window,)
+            )]
+
+        result: Dict[str, any] = {
+            'pending': counts.get('pending', 0),
+            'sending': counts.get('sending', 0),
+            'sent': counts.get('sent', 0),
+            'failed': counts.get('failed', 0),
+            'oldest_pending_age': round(time.time() - oldest, 3) if oldest else None,
+        }
+        if latencies:
+            latencies.sort()
+            result['delivery_latency'] = {
+                'count': len(latencies),
+                'mean': round(statistics.fmean(latencies), 3),
+                'p50': round(latencies[len(latencies) // 2], 3),
+                'p95': round(latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)], 3),
+                'max': round(latencies[-1], 3),
+            }
+        return result
+
+    def close(self) -> None:
+        self.conn.close()
+
+def deliver_outbox_message(outbox: Outbox, item: Dict, token: str) -> bool:
+    """Send the unsent chunks of one claimed outbox message; True when fully delivered."""
+    url = f"https://discord.com/api/v10/channels/{item['channel_id']}/messages"
+    headers = {
+        "Authorization": f"Bot {token}",
+        "Content-Type": "application/json"
+    }
+    chunks = item['chunks']
+    attempts = item['attempts'] + 1
+
+    try:
+        for index in range(item['next_chunk'], len(chunks)):
+            if item['attachment'] is not None:
+                result = post_attachment_with_retry(
+                    url, headers, chunks[index], item['filename'], item['attachment'].encode('utf-8')
+                )
+            else:
+                result = post_with_retry(url, headers, chunks[index])
+
+            if not result.get("success"):
+                error = f"{result.get('error')} {result.get('details', '')}".strip()
+                outbox.failed(item['id'], attempts, error)
+                print(f"⚠️  Outbox #{item['id']} chunk {index + 1}/{len(chunks)} failed: {error}", file=sys.stderr)
+                return False
+            outbox.chunk_sent(item['id'], index + 1)
+    except requests.exceptions.RequestException as e:
+        outbox.failed(item['id'], attempts, str(e))
+        print(f"⚠️  Outbox #{item['id']} network error: {e}", file=sys.stderr)
+        return False
+    except Exception as e:
+        # Anything else (a bad row, an encoding error...) must not leave the message leased
+        error = f"{type(e).__name__}: {e}"
+        outbox.failed(item['id'], attempts, error)
+        print(f"⚠️  Outbox #{item['id']} delivery error: {error}", file=sys.stderr)
+        return False
+
+    outbox.delivered(item['id'])
+    print(f"✅ Outbox #{item['id']} delivered to {item['channel_id']} ({len(chunks)} chunk(s))", file=sys.stderr)
+    return True
+
+def run_outbox_worker(
+    outbox: Outbox,
+    token: str,
+    max_workers: int = 4,
+    poll_interval: float = 1.0,
+    once: bool = False,
+) -> None:
+    """
+    Drain the outbox, sending to different channels concurrently.
+
+    Each channel is handled by at most one thread at a time so its messages
+    stay in order; other workers on the same outbox respect the lease of
+    messages this one is delivering. With once=True, return when nothing is due; otherwise
+    keep polling for new messages until interrupted.
+    """
+    get_session(pool_size=max_workers)
+    recovered = outbox.recover()
+    if recovered:
+        print(f"♻️  Resuming {recovered} message(s) interrupted mid-delivery", file=sys.stderr)
+
+    busy: Dict[str, any] = {}
+
+    def drain_channel(channel_id: str) -> None:
+        while True:
+            item = outbox.claim(channel_id)
+            if item is None or not deliver_outbox_message(outbox, item, token):
+                return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            for channel_id, future in list(busy.items()):
+                if future.done():
+                    future.result()
+                    del busy[channel_id]
+
+            for channel_id in outbox.ready_channels():
+                if channel_id not in busy:
+                    busy[channel_id] = executor.submit(drain_channel, channel_id)
+
+            if once and not busy:
+                return
+            time.sleep(poll_interval if not busy else min(poll_interval, 0.1))
+
 def main():
     """Main function"""
-    if len(sys.argv) < 2:
-        print("Usage: python send_message.py <message> [channel_id] [token]")
-        print("\nExample:")
-        print('  python send_message.py "Hello from Claude!"')
-        print('  python send_message.py "Hello" 1234567890 "your_bot_token"')
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description='Send a message to a Discord channel',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Example:
+  python send_message.py "Hello from Claude!"
+  python send_message.py "Hello" 1234567890 "your_bot_token"
+  python send_message.py "$(cat summary.md)" --attach-over 3 --filename summary.md
+  python send_message.py --file summary.md
+  cat summary.md | python send_message.py -
+  python send_message.py "$(cat summary.md)" --channels 111,222,333
+  python send_message.py "$(cat summary.md)" --enqueue
+  python send_message.py --worker
+  python send_message.py --outbox-stats
+        """
+    )
+    parser.add_argument('message', nargs='?', help="Message to send ('-' to read stdin)")
+    parser.add_argument('channel_id', nargs='?', help='Channel ID (default: DISCORD_CHANNEL_ID)')
+    parser.add_argument('token', nargs='?', help='Bot token (default: DISCORD_BOT_TOKEN)')
+    parser.add_argument('--file', '-f', metavar='PATH',
+                        help="Read the message from a file ('-' for stdin) and stream it to Discord")
+    parser.add_argument('--attach-over', type=int, metavar='N',
+                        help='If the message needs more than N chunks, send a preview '
+                             'with the full text attached as a file (1 request)')
+    parser.add_argument('--filename', default=DEFAULT_ATTACHMENT_NAME,
+                        help=f'Attachment file name (default: {DEFAULT_ATTACHMENT_NAME})')
+    parser.add_argument('--channels', metavar='ID,ID,...',
+                        help='Post to several channels concurrently (comma-separated IDs)')
+    parser.add_argument('--enqueue', action='store_true',
+                        help='Spool the message in the outbox and return immediately '
+                             '(delivered by --worker)')
+    parser.add_argument('--worker', action='store_true',
+                        help='Run the outbox delivery worker until interrupted')
+    parser.add_argument('--once', action='store_true',
+                        help='With --worker: exit once nothing is due')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Channels delivered concurrently by --worker (default: 4)')
+    parser.add_argument('--outbox-stats', action='store_true',
+                        help='Print outbox queue depth and delivery latency as JSON')
+    parser.add_argument('--outbox', default=str(DEFAULT_OUTBOX_PATH),
+                        help=f'Outbox database (default: {DEFAULT_OUTBOX_PATH})')
+    args = parser.parse_args()
+
+    if args.worker or args.outbox_stats:
+        return outbox_main(args)
+    channel_id = args.channel_id
+    token = args.token
+    source = args.file
+    if source is None and args.message == '-':
+        source = '-'
+    elif source is not None and args.message is not None:
+        # With --file the positionals shift: message slot holds the channel ID
+        channel_id, token = args.message, args.channel_id
+    elif source is None and args.message is None:
+        parser.error('a message, --file PATH or - (stdin) is required')
+
+    if source is not None:
+        infile = sys.stdin if source == '-' else open(source, encoding='utf-8')
+        try:
+            # Attachments, fan-out and the outbox need the whole text; plain sends stream
+            if args.attach_over is not None or args.channels or args.enqueue:
+                message = infile.read()
+            else:
+                return stream_main(infile, channel_id, token)
+        finally:
+            if infile is not sys.stdin:
+                infile.close()
+    else:
+        message = args.message
+
+    channel_ids = [c.strip() for c in args.channels.split(',') if c.strip()] if args.channels else []
+
+    if args.enqueue:
+        try:
+            if not channel_ids:
+                channel_ids = [resolve_credentials(channel_id, token)[0]]
+            outbox = Outbox(args.outbox)
+            for target in channel_ids:
+                message_id = outbox.enqueue(message, target, attachment_threshold=args.attach_over,
+                                            filename=args.filename)
+                print(f"📥 Queued as outbox #{message_id} for channel {target}")
+            depth = outbox.stats()['pending']
+            outbox.close()
+        except Exception as e:
+            print(f"❌ Error: {str(e)}")
+            sys.exit(1)
+        print(f"📬 {depth} message(s) pending in the outbox")
+        return
 
-    message = sys.argv[1]
-    channel_id = sys.argv[2] if len(sys.argv) > 2 else None
-    token = sys.argv[3] if len(sys.argv) > 3 else None
+    if channel_ids:
+        return fanout_main(message, channel_ids, token, args)
 
     try:
         print("=" * 70)
@@ -176,29 +1006,92 @@ def main():
         print(f"Message preview: {preview}")
         print("-" * 70)
 
-        result = send_discord_message(message, channel_id, token)
+        result = send_discord_message(message, channel_id, token,
+                                      attachment_threshold=args.attach_over,
+                                      filename=args.filename)
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        sys.exit(1)
 
+    print_result(result)
+
+def print_result(result: Dict) -> None:
+    """Print the outcome of a send and exit non-zero on failure."""
+    if result["success"]:
+        print("✅ SUCCESS!")
+        print(result["message"])
+        last_response = result["responses"][-1]
+        print(f"Last Message ID: {last_response.get('id', 'N/A')}")
+        print(f"Channel ID: {last_response.get('channel_id', 'N/A')}")
+        print(f"Timestamp: {last_response.get('timestamp', 'N/A')}")
+        print("=" * 70)
+    else:
+        print("❌ FAILED!")
+        print(f"Error: {result.get('error')}")
+        if 'details' in result:
+            print(f"Details: {result['details']}")
+        if 'failed_chunk_index' in result:
+            print(f"Failed chunk: {result['failed_chunk_index']}")
+        print("=" * 70)
+        sys.exit(1)
+
+def stream_main(infile: TextIO, channel_id: Optional[str], token: Optional[str]) -> None:
+    """Stream a file or stdin to Discord chunk by chunk."""
+    try:
+        print("=" * 70)
+        print(f"🚀 Discord Message Sender (streaming {getattr(infile, 'name', 'input')})")
+        print("=" * 70)
+        result = send_discord_stream(infile, channel_id, token)
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        sys.exit(1)
+    print_result(result)
+
+def fanout_main(message: str, channel_ids: List[str], token: Optional[str], args) -> None:
+    """Send one message to several channels and print a per-channel summary."""
+    try:
+        print("=" * 70)
+        print(f"🚀 Discord Message Sender ({len(channel_ids)} channels)")
+        print("=" * 70)
+        start = time.perf_counter()
+        results = send_to_channels(message, channel_ids, token=token,
+                                   attachment_threshold=args.attach_over, filename=args.filename)
+        elapsed = time.perf_counter() - start
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        sys.exit(1)
+
+    failed = 0
+    for target, result in results.items():
         if result["success"]:
-            print("✅ SUCCESS!")
-            print(result["message"])
-            last_response = result["responses"][-1]
-            print(f"Last Message ID: {last_response.get('id', 'N/A')}")
-            print(f"Channel ID: {last_response.get('channel_id', 'N/A')}")
-            print(f"Timestamp: {last_response.get('timestamp', 'N/A')}")
-            print("=" * 70)
+            print(f"✅ {target}: {result['message']}")
         else:
-            print("❌ FAILED!")
-            print(f"Error: {result.get('error')}")
-            if 'details' in result:
-                print(f"Details: {result['details']}")
-            if 'failed_chunk_index' in result:
-                print(f"Failed chunk: {result['failed_chunk_index']}")
-            print("=" * 70)
-            sys.exit(1)
+            failed += 1
+            print(f"❌ {target}: {result.get('error')} {result.get('details', '')}".rstrip())
+    print(f"Finished in {elapsed:.2f}s ({len(results) - failed}/{len(results)} channels succeeded)")
+    print("=" * 70)
+    if failed:
+        sys.exit(1)
+
+def outbox_main(args) -> None:
+    """Run the outbox worker or print outbox statistics."""
+    outbox = Outbox(args.outbox)
+    try:
+        if args.outbox_stats:
+            print(json.dumps(outbox.stats(), indent=2))
+            return
 
+        _, token = resolve_credentials(args.channel_id or 'unused', args.token)
+        print(f"📤 Outbox worker started ({outbox.path}, {args.workers} channel(s) at a time)", file=sys.stderr)
+        run_outbox_worker(outbox, token, max_workers=args.workers, once=args.once)
+        print(json.dumps(outbox.stats(), indent=2), file=sys.stderr)
+    except KeyboardInterrupt:
+        print("\n⏹️  Outbox worker stopped", file=sys.stderr)
     except Exception as e:
         print(f"❌ Error: {str(e)}")
         sys.exit(1)
+    finally:
+        outbox.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for transcript representations
+
+Compares the get_subtitles() JSON shape (a dict per snippet plus the merged
+text) against CompactTranscript: Python heap held after building, size on
+disk (JSON vs. the compact binary format) and time to load each back.
+Synthetic transcripts are used unless --json files from
+extract_subtitles_v2.py --json are given.
+
+Usage:
+    python benchmark_transcript_memory.py
+    python benchmark_transcript_memory.py --snippets 1000 100000 --text ko
+    python benchmark_transcript_memory.py --json transcript.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+from typing import Callable, List, Tuple
+
+from compact_transcript import CompactTranscript
+from extract_subtitles_v2 import build_result
+
+
+WORDS = {
+    'en': ['so', 'today', 'we', 'are', 'going', 'to', 'look', 'at', 'the', 'new', 'release',
+           'and', 'what', 'it', 'means', 'for', 'your', 'code', 'base', 'performance'],
+    'ko': ['안녕하세요', '오늘은', '새로운', '기능을', '살펴보겠습니다', '그리고', '코드', '성능',
+           '이번', '영상에서는', '정리해', '보겠습니다', '먼저', '설치부터']
+}
+
+
+def build_snippets(count: int, language: str = 'en', seed: int = 0) -> List[Tuple[str, float, float]]:
+    """Auto-caption-like snippets: 3-10 words, ~2-4 seconds each."""
+    rng = random.Random(seed)
+    words = WORDS[language]
+    snippets = []
+    start = 0.0
+    for _ in range(count):
+        duration = round(rng.uniform(2.0, 4.0), 3)
+        text = ' '.join(rng.choice(words) for _ in range(rng.randint(3, 10)))
+        snippets.append((text, round(start, 3), duration))
+        start += duration
+    return snippets
+
+
+def retained_bytes(factory: Callable[[], object]) -> Tuple[int, object]:
+    """Bytes still allocated after factory() returns, with its result kept alive."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    value = factory()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, value
+
+
+def time_call(func: Callable[[], object], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def load_json_snippets(path: str) -> List[Tuple[str, float, float]]:
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return [(entry['text'], entry['start'], entry['duration']) for entry in data['transcript']]
+
+
+def benchmark(label: str, snippets: List[Tuple[str, float, float]], workdir: str, repeat: int) -> None:
+    # Materialize the text once outside the measurement, as a fetch would
+    snippets = [(str(text), float(start), float(duration)) for text, start, duration in snippets]
+
+    json_bytes, result = retained_bytes(lambda: build_result('benchmark00', 'en', snippets, []))
+    compact_bytes, compact = retained_bytes(
+        lambda: build_result('benchmark00', 'en', snippets, [], compact=True))
+    transcript = compact['transcript']
+
+    json_path = os.path.join(workdir, 'transcript.json')
+    compact_path = os.path.join(workdir, 'transcript.ytct')
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False)
+    transcript.save(compact_path)
+
+    def load_json():
+        with open(json_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    json_load = time_call(load_json, repeat)
+    mmap_load = time_call(lambda: CompactTranscript.load(compact_path).close(), repeat)
+    mapped_bytes, mapped = retained_bytes(lambda: CompactTranscript.load(compact_path))
+    mapped.close()
+
+    print(f"{label:<22} {len(snippets):>8} | {json_bytes / 1024:>9.0f} {compact_bytes / 1024:>9.0f} "
+          f"{json_bytes / max(compact_bytes, 1):>6.1f}x {mapped_bytes / 1024:>7.1f} | "
+          f"{os.path.getsize(json_path) / 1024:>8.0f} {os.path.getsize(compact_path) / 1024:>8.0f} | "
+          f"{json_load * 1000:>8.2f} {mmap_load * 1000:>7.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark transcript memory use')
+    parser.add_argument('--snippets', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Synthetic transcript sizes (default: 1000 10000 100000)')
+    parser.add_argument('--text', choices=sorted(WORDS), nargs='+', default=['en', 'ko'],
+                        help='Synthetic text language (default: en ko)')
+    parser.add_argument('--json', nargs='*', default=[],
+                        help='Use transcripts saved by extract_subtitles_v2.py --json instead')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per load timing, best time is kept')
+    args = parser.parse_args()
+
+    print(f"{'transcript':<22} {'snippets':>8} | {'dicts KiB':>9} {'cols KiB':>9} {'ratio':>7} "
+          f"{'mmap KiB':>7} | {'JSON KiB':>8} {'bin KiB':>8} | {'JSON ms':>8} {'mmap ms':>7}")
+    print("-" * 114)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.json:
+            for path in args.json:
+                benchmark(os.path.basename(path)[:22], load_json_snippets(path), workdir, args.repeat)
+        else:
+            for language in args.text:
+                for count in args.snippets:
+                    benchmark(f"synthetic-{language}", build_snippets(count, language), workdir, args.repeat)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Columnar, memory-compact transcript representation
+
+A CompactTranscript keeps snippet start times and durations in two
+array('d') columns and all snippet text in one UTF-8 buffer addressed by an
+offsets column, instead of one dict per snippet plus a merged copy of the
+text. Snippets are exposed as lazy read-only dict views, so code written
+for get_subtitles()'s `transcript` list keeps working; pass
+`default=json_default` to json.dump()/dumps() to serialize them.
+
+The binary format (see save()) is the same columns laid out back to back,
+so load() can memory-map a file and use it without copying or parsing.
+"""
+
+import sys
+import mmap
+import struct
+from array import array
+from pathlib import Path
+from collections.abc import Mapping, Sequence
+from typing import Iterable, Iterator, List, Dict, Tuple, Union
+
+MAGIC = b'YTCT'
+FORMAT_VERSION = 1
+# magic, version, snippet count, text buffer size
+HEADER = struct.Struct('<4sIQQ')
+# Column typecodes in file order; all are 8 bytes wide, so columns stay 8-byte aligned
+COLUMN_TYPECODES = ('d', 'd', 'Q')
+SNIPPET_KEYS = ('text', 'start', 'duration')
+
+
+class SnippetView(Mapping):
+    """Read-only {'text', 'start', 'duration'} view of one snippet, decoded on access"""
+
+    __slots__ = ('_transcript', '_index')
+
+    def __init__(self, transcript: 'CompactTranscript', index: int):
+        self._transcript = transcript
+        self._index = index
+
+    def __getitem__(self, key: str):
+        if key == 'text':
+            return self._transcript.text_at(self._index)
+        if key == 'start':
+            return self._transcript.starts[self._index]
+        if key == 'duration':
+            return self._transcript.durations[self._index]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(SNIPPET_KEYS)
+
+    def __len__(self) -> int:
+        return len(SNIPPET_KEYS)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class CompactTranscript(Sequence):
+    """
+    Transcript stored as columns: starts, durations, text offsets, text buffer.
+
+    Indexing returns a SnippetView; slicing returns a list of views.
+    """
+
+    def __init__(self, starts, durations, offsets, text: Union[bytes, memoryview], backing=None):
+        self.starts = starts
+        self.durations = durations
+        self.offsets = offsets  # len(self) + 1 byte offsets into text
+        self.text = text
+        self._backing = backing  # mmap kept open while the columns point into it
+
+    def close(self) -> None:
+        """Release the memory map of a transcript opened with load()."""
+        if self._backing is not None:
+            for column in (self.starts, self.durations, self.offsets, self.text):
+                if isinstance(column, memoryview):
+                    column.release()
+            self._backing.close()
+            self._backing = None
+
+    @classmethod
+    def from_snippets(cls, snippets: Iterable) -> 'CompactTranscript':
+        """
+        Build from (text, start, duration) tuples or {'text', 'start', 'duration'} dicts.
+        """
+        starts = array('d')
+        durations = array('d')
+        offsets = array('Q', [0])
+        text = bytearray()
+        for snippet in snippets:
+            if isinstance(snippet, Mapping):
+                snippet = (snippet['text'], snippet['start'], snippet['duration'])
+            snippet_text, start, duration = snippet
+            text += snippet_text.encode('utf-8')
+            starts.append(start)
+            durations.append(duration)
+            offsets.append(len(text))
+        return cls(starts, durations, offsets, bytes(text))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [SnippetView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('transcript index out of range')
+        return SnippetView(self, index)
+
+    def text_at(self, index: int) -> str:
+        return bytes(self.text[self.offsets[index]:self.offsets[index + 1]]).decode('utf-8')
+
+    def iter_snippets(self) -> Iterator[Tuple[str, float, float]]:
+        """Yield (text, start, duration) tuples."""
+        for i in range(len(self)):
+            yield self.text_at(i), self.starts[i], self.durations[i]
+
+    def merged_text(self, separator: str = ' ') -> str:
+        """All snippet text joined, like get_subtitles()'s `transcript_merged`."""
+        return separator.join(self.text_at(i) for i in range(len(self)))
+
+    def to_dicts(self) -> List[Dict]:
+        """Plain list of dicts, e.g. for JSON output."""
+        return [{'text': text, 'start': start, 'duration': duration}
+                for text, start, duration in self.iter_snippets()]
+
+    def nbytes(self) -> int:
+        """Size of the column data in bytes."""
+        return (len(self.starts) + len(self.durations) + len(self.offsets)) * 8 + len(self.text)
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize as: header, starts (float64), durations (float64),
+        offsets (uint64, len + 1), UTF-8 text. Little-endian; every column
+        starts on an 8-byte boundary so it can be cast in place after mmap.
+        """
+        parts = [HEADER.pack(MAGIC, FORMAT_VERSION, len(self), len(self.text))]
+        for column, typecode in zip((self.starts, self.durations, self.offsets), COLUMN_TYPECODES):
+            column = array(typecode, column)
+            if sys.byteorder == 'big':
+                column.byteswap()
+            parts.append(column.tobytes())
+        parts.append(bytes(self.text))
+        return b''.join(parts)
+
+    def save(self, path: Union[str, Path]) -> None:
+        Path(path).write_bytes(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: Union[str, Path], use_mmap: bool = True) -> 'CompactTranscript':
+        """
+        Load a file written by save(). With use_mmap the columns are
+        zero-copy views into the memory-mapped file, so loading is O(1) and
+        pages are read only when snippets are accessed.
+        """
+        with open(path, 'rb') as f:
+            if use_mmap:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                buffer = f.read()
+        return cls.from_buffer(buffer, backing=buffer if use_mmap else None)
+
+    @classmethod
+    def from_buffer(cls, buffer, backing=None) -> 'CompactTranscript':
+        """Wrap bytes, bytearray or mmap holding the save() format without copying it."""
+        view = memoryview(buffer)
+        magic, version, count, text_size = HEADER.unpack_from(view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError('Not a compact transcript file')
+
+        columns = []
+        position = HEADER.size
+        for typecode, length in zip(COLUMN_TYPECODES, (count, count, count + 1)):
+            raw = view[position:position + length * 8]
+            if sys.byteorder == 'big':
+                # The file is little-endian: copy and swap instead of casting in place
+                column = array(typecode, raw.tobytes())
+                column.byteswap()
+            else:
+                column = raw.cast(typecode)
+            columns.append(column)
+            position += length * 8
+        text = view[position:position + text_size]
+        if len(text) != text_size:
+            raise ValueError('Truncated compact transcript file')
+        return cls(*columns, text, backing=backing)
+
+
+def json_default(value):
+    """json.dumps() hook: CompactTranscript -> list of dicts, SnippetView -> dict."""
+    if isinstance(value, CompactTranscript):
+        return value.to_dicts()
+    if isinstance(value, SnippetView):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -7,7 +7,24 @@ This version directly fetches YouTube's official subtitles without needing API k
 import sys
 import json
 import re
-from typing import Optional, List, Dict
+import time
+import zlib
+import sqlite3
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional, List, Dict, Tuple, Union
+
+from compact_transcript import CompactTranscript, json_default
+
+
+DEFAULT_CACHE_PATH = Path.home() / '.cache' / 'youtube-subtitle-extractor' / 'transcripts.sqlite3'
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024  # compressed snippet data kept on disk
+DEFAULT_WORKERS = 4
+TIMESTAMP_REGEX = re.compile(r'^\[?(?:(\d+):)?(\d+):(\d{1,2}(?:\.\d+)?)\]?$')
+DURATION_REGEX = re.compile(r'^(?:(\d+)h)?(?:(\d+)m)?(?:(\d+(?:\.\d+)?)s?)?$')
 
 
 def extract_video_id(url: str) -> str:
@@ -30,16 +47,199 @@ def extract_video_id(url: str) -> str:
     raise ValueError(f"Could not extract video ID from: {url}")
 
 
-def get_subtitles(youtube_url: str, languages: Optional[List[str]] = None) -> Dict:
+class TranscriptCache:
+    """
+    On-disk transcript cache backed by SQLite.
+
+    Snippets are stored zlib-compressed per (video_id, language, is_generated)
+    track, together with the video's list of available tracks, so a later
+    request can decide which track it would get without asking YouTube.
+    When the compressed data exceeds `max_bytes`, the least recently used
+    tracks are evicted. Thread-safe.
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        if str(path) != ':memory:':
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS tracks ('
+            ' video_id TEXT NOT NULL,'
+            ' language TEXT NOT NULL,'
+            ' is_generated INTEGER NOT NULL,'
+            ' data BLOB NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' fetched_at REAL NOT NULL,'
+            ' last_used REAL NOT NULL,'
+            ' PRIMARY KEY (video_id, language, is_generated))'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS tracks_last_used ON tracks (last_used)')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS listings ('
+            ' video_id TEXT PRIMARY KEY,'
+            ' languages TEXT NOT NULL,'
+            ' fetched_at REAL NOT NULL)'
+        )
+        self.conn.commit()
+
+    def get_listing(self, video_id: str) -> Optional[List[Dict]]:
+        with self._lock:
+            row = self.conn.execute('SELECT languages FROM listings WHERE video_id = ?', (video_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_track(self, video_id: str, language: str, is_generated: bool) -> Optional[List[Tuple[str, float, float]]]:
+        """Return the cached snippets as (text, start, duration) tuples, or None."""
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT data FROM tracks WHERE video_id = ? AND language = ? AND is_generated = ?',
+                (video_id, language, int(is_generated))
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                'UPDATE tracks SET last_used = ? WHERE video_id = ? AND language = ? AND is_generated = ?',
+                (time.time(), video_id, language, int(is_generated))
+            )
+            self.conn.commit()
+        return [tuple(snippet) for snippet in json.loads(zlib.decompress(row[0]))]
+
+    def put(self, video_id: str, language: str, is_generated: bool,
+            snippets: List[Tuple[str, float, float]], available_languages: List[Dict]) -> None:
+        """Store one track and the video's track listing, then enforce max_bytes."""
+        data = zlib.compress(json.dumps(snippets, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO tracks (video_id, language, is_generated, data, size, fetched_at, last_used) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (video_id, language, int(is_generated), data, len(data), now, now)
+            )
+            self.conn.execute(
+                'INSERT OR REPLACE INTO listings (video_id, languages, fetched_at) VALUES (?, ?, ?)',
+                (video_id, json.dumps(available_languages, ensure_ascii=False), now)
+            )
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self) -> None:
+        if not self.max_bytes:
+            return
+        (total,) = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM tracks').fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self.conn.execute('SELECT rowid, size FROM tracks ORDER BY last_used').fetchall()
+        doomed = []
+        for rowid, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((rowid,))
+            total -= size
+        self.conn.executemany('DELETE FROM tracks WHERE rowid = ?', doomed)
+        self.conn.execute('DELETE FROM listings WHERE video_id NOT IN (SELECT video_id FROM tracks)')
+
+    def stats(self) -> Dict:
+        with self._lock:
+            tracks, size = self.conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM tracks').fetchone()
+        return {'tracks': tracks, 'bytes': size}
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def choose_track(available_languages: List[Dict], languages: List[str]) -> Optional[Tuple[str, bool, Optional[str]]]:
+    """
+    Negotiate which track to fetch from a video's track listing.
+
+    The first preferred language that exists wins, manual before generated.
+    Failing that, a translatable track (manual first) is translated into the
+    first preferred language. Entries may carry 'translation_languages'
+    (target codes) to rule out unsupported translations.
+
+    Returns:
+        (language_code, is_generated, translated_from) where translated_from
+        is the source language code for a translation, else None; or None if
+        nothing fits
+    """
+    for code in languages:
+        for is_generated in (False, True):
+            for track in available_languages:
+                if track.get('code') == code and bool(track.get('is_generated')) == is_generated:
+                    return code, is_generated, None
+
+    if languages:
+        for is_generated in (False, True):
+            for track in available_languages:
+                if track.get('is_translatable') and bool(track.get('is_generated')) == is_generated:
+                    targets = track.get('translation_languages')
+                    if targets is None or languages[0] in targets:
+                        return languages[0], is_generated, track['code']
+    return None
+
+
+def cache_language(choice: Tuple[str, bool, Optional[str]]) -> str:
+    """Language key of a negotiated track in TranscriptCache ('en>ko' for translations)"""
+    code, _, translated_from = choice
+    return f"{translated_from}>{code}" if translated_from else code
+
+
+def build_result(video_id: str, language: str, snippets: List[Tuple[str, float, float]],
+                 available_languages: List[Dict], cached: bool = False,
+                 translated_from: Optional[str] = None, compact: bool = False) -> Dict:
+    """
+    Assemble the get_subtitles() result from (text, start, duration) snippets
+
+    With compact, 'transcript' is a CompactTranscript and 'transcript_merged'
+    is left out (use transcript.merged_text()), so the text is held once.
+    """
+    result = {
+        'success': True,
+        'video_id': video_id,
+        'video_url': f"https://www.youtube.com/watch?v={video_id}",
+        'language_used': language,
+        'available_languages': available_languages
+    }
+    if compact:
+        transcript = CompactTranscript.from_snippets(snippets)
+        result['transcript'] = transcript
+        result['total_entries'] = len(transcript)
+        result['total_characters'] = sum(len(text) for text, _, _ in snippets) + max(len(transcript) - 1, 0)
+    else:
+        merged_text = ' '.join(text for text, _, _ in snippets)
+        result['transcript'] = [
+            {'text': text, 'start': start, 'duration': duration}
+            for text, start, duration in snippets
+        ]
+        result['transcript_merged'] = merged_text
+        result['total_entries'] = len(result['transcript'])
+        result['total_characters'] = len(merged_text)
+    result['cached'] = cached
+    if translated_from:
+        result['translated_from'] = translated_from
+    return result
+
+
+def get_subtitles(youtube_url: str, languages: Optional[List[str]] = None,
+                  cache: Optional[TranscriptCache] = None, refresh: bool = False,
+                  api=None, compact: bool = False) -> Dict:
     """
     Extract subtitles using youtube-transcript-api
 
     Args:
         youtube_url: YouTube video URL or ID
         languages: List of language codes to try (e.g., ['ko', 'en'])
+        cache: Optional TranscriptCache; a cached track is returned without
+            any request to YouTube
+        refresh: Ignore cached entries and fetch again (the cache is updated)
+        api: Optional YouTubeTranscriptApi to reuse (and its HTTP session)
+        compact: Return the transcript as a CompactTranscript (see build_result)
 
     Returns:
         Dictionary with success status, video info, and subtitle data
+        ('cached' tells whether it came from the cache)
     """
     try:
         from youtube_transcript_api import YouTubeTranscriptApi
@@ -62,17 +262,60 @@ def get_subtitles(youtube_url: str, languages: Optional[List[str]] = None) -> Di
         if languages is None:
             languages = ['ko', 'en']
 
+        if cache is not None and not refresh:
+            listing = cache.get_listing(video_id)
+            choice = choose_track(listing, languages) if listing else None
+            snippets = cache.get_track(video_id, cache_language(choice), choice[1]) if choice else None
+            if snippets is not None:
+                print(f"💾 Cache hit: {video_id} ({cache_language(choice)}, auto-generated: {choice[1]})",
+                      file=sys.stderr)
+                return build_result(video_id, choice[0], snippets, listing, cached=True,
+                                    translated_from=choice[2], compact=compact)
+
         print(f"🔍 Attempting to fetch transcript for video: {video_id}", file=sys.stderr)
         print(f"🔍 Preferred languages: {', '.join(languages)}", file=sys.stderr)
 
         # Create API instance
-        api = YouTubeTranscriptApi()
+        if api is None:
+            api = YouTubeTranscriptApi()
+
+        # One listing request, then negotiate locally and fetch only the chosen track
+        tracks = {}
+        available_languages = []
+        for transcript in api.list(video_id):
+            tracks[(transcript.language_code, transcript.is_generated)] = transcript
+            available_languages.append({
+                'code': transcript.language_code,
+                'language': transcript.language,
+                'is_generated': transcript.is_generated,
+                'is_translatable': transcript.is_translatable
+            })
+
+        choice = choose_track([
+            dict(info, translation_languages=[
+                language.language_code
+                for language in tracks[(info['code'], info['is_generated'])].translation_languages
+            ])
+            for info in available_languages
+        ], languages)
+        if choice is None:
+            print(f"❌ No transcript in {', '.join(languages)}", file=sys.stderr)
+            return {
+                'success': False,
+                'video_id': video_id,
+                'video_url': video_url,
+                'available_languages': available_languages,
+                'error': f"No transcript found in: {', '.join(languages)}"
+            }
 
-        # Try to fetch with preferred languages
+        used_language, is_generated, translated_from = choice
         try:
-            fetched_transcript = api.fetch(video_id, languages=languages, preserve_formatting=False)
-            used_language = fetched_transcript.language_code
-            is_generated = fetched_transcript.is_generated
+            if translated_from:
+                print(f"🌐 Translating {translated_from} transcript to {used_language}", file=sys.stderr)
+                transcript = tracks[(translated_from, is_generated)].translate(used_language)
+            else:
+                transcript = tracks[(used_language, is_generated)]
+            fetched_transcript = transcript.fetch(preserve_formatting=False)
             print(f"✅ Successfully fetched transcript in language: {used_language} (auto-generated: {is_generated})", file=sys.stderr)
             print(f"✅ Total snippets: {len(fetched_transcript.snippets)}", file=sys.stderr)
         except Exception as e:
@@ -84,46 +327,12 @@ def get_subtitles(youtube_url: str, languages: Optional[List[str]] = None) -> Di
                 'error': f'Failed to fetch transcript: {str(e)}'
             }
 
-        # Try to get list of available languages for informational purposes
-        available_languages = []
-        try:
-            transcript_list = api.list(video_id)
-            for transcript in transcript_list:
-                available_languages.append({
-                    'code': transcript.language_code,
-                    'language': transcript.language,
-                    'is_generated': transcript.is_generated,
-                    'is_translatable': transcript.is_translatable
-                })
-        except:
-            # If we can't get the list, just note the language we used
-            available_languages = [{'code': used_language, 'language': used_language}]
-
-        # Format the transcript
-        formatted_transcript = []
-        full_text = []
-
-        for snippet in fetched_transcript.snippets:
-            formatted_transcript.append({
-                'text': snippet.text,
-                'start': snippet.start,
-                'duration': snippet.duration
-            })
-            full_text.append(snippet.text)
+        snippets = [(snippet.text, snippet.start, snippet.duration) for snippet in fetched_transcript.snippets]
+        if cache is not None:
+            cache.put(video_id, cache_language(choice), is_generated, snippets, available_languages)
 
-        merged_text = ' '.join(full_text)
-
-        return {
-            'success': True,
-            'video_id': video_id,
-            'video_url': video_url,
-            'language_used': used_language,
-            'available_languages': available_languages,
-            'transcript': formatted_transcript,
-            'transcript_merged': merged_text,
-            'total_entries': len(formatted_transcript),
-            'total_characters': len(merged_text)
-        }
+        return build_result(video_id, used_language, snippets, available_languages,
+                            translated_from=translated_from, compact=compact)
 
     except TranscriptsDisabled:
         return {
@@ -151,6 +360,162 @@ def get_subtitles(youtube_url: str, languages: Optional[List[str]] = None) -> Di
         }
 
 
+def parse_timestamp(value: Union[str, float, int]) -> float:
+    """
+    Parse a timestamp into seconds
+
+    Accepts seconds (90, '90', '090s'), '[mm:ss]' / 'h:mm:ss', '1h2m3s', and
+    YouTube links or query strings carrying t= ('...watch?v=ID&t=754s').
+    Out-of-range clock fields ('12:75', or '1:75:00' with an hour field)
+    raise ValueError like any other malformed timestamp.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    text = value.strip()
+    match = re.search(r'[?&#]t=([^&#]+)', text)
+    if match:
+        text = match.group(1)
+
+    match = TIMESTAMP_REGEX.match(text) or (DURATION_REGEX.match(text) if text else None)
+    if not match:
+        raise ValueError(f"Invalid timestamp: {value}")
+
+    hours, minutes, seconds = match.groups()
+    # A field only has to stay below 60 when a larger unit is given ('90s' is fine)
+    if seconds is not None and (minutes is not None or hours is not None) and float(seconds) >= 60:
+        raise ValueError(f"Invalid timestamp: {value} (seconds must be below 60)")
+    if minutes is not None and hours is not None and int(minutes) >= 60:
+        raise ValueError(f"Invalid timestamp: {value} (minutes must be below 60)")
+    return int(hours or 0) * 3600 + int(minutes or 0) * 60 + float(seconds or 0)
+
+
+def format_timestamp(seconds: float) -> str:
+    """'mm:ss' as used in summaries (minutes are not wrapped into hours)"""
+    return f"{int(seconds // 60):02d}:{int(seconds % 60):02d}"
+
+
+def deep_link(video_id: str, seconds: float) -> str:
+    """Video link that starts playback at `seconds` (&t=000s form)"""
+    return f"https://www.youtube.com/watch?v={video_id}&t={int(seconds):03d}s"
+
+
+class TranscriptIndex:
+    """
+    Time lookups over a transcript in O(log n) by bisecting snippet starts
+
+    Works on get_subtitles()'s 'transcript' list as well as on a
+    CompactTranscript, whose start/duration columns are used without copying.
+    Timestamps may be anything parse_timestamp() accepts.
+    """
+
+    def __init__(self, transcript, video_id: Optional[str] = None):
+        self.transcript = transcript
+        self.video_id = video_id
+        if isinstance(transcript, CompactTranscript):
+            self.starts = transcript.starts
+            self.durations = transcript.durations
+        else:
+            self.starts = array('d', (entry['start'] for entry in transcript))
+            self.durations = array('d', (entry['duration'] for entry in transcript))
+        if any(self.starts[i] > self.starts[i + 1] for i in range(len(self.starts) - 1)):
+            raise ValueError('Transcript snippets are not ordered by start time')
+        self.end = max((start + duration for start, duration in zip(self.starts, self.durations)),
+                       default=0.0)
+
+    @classmethod
+    def from_result(cls, result: Dict) -> 'TranscriptIndex':
+        """Index a successful get_subtitles() result"""
+        return cls(result['transcript'], result.get('video_id'))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def position_at(self, timestamp) -> Optional[int]:
+        """Index of the last snippet starting at or before `timestamp` (None if before the first)"""
+        position = bisect_right(self.starts, parse_timestamp(timestamp)) - 1
+        return position if position >= 0 else None
+
+    def at(self, timestamp):
+        """
+        The snippet being spoken at `timestamp`, or None in a gap between
+        snippets or outside the transcript
+        """
+        seconds = parse_timestamp(timestamp)
+        position = self.position_at(seconds)
+        if position is None or seconds >= self.starts[position] + self.durations[position]:
+            return None
+        return self.transcript[position]
+
+    def span(self, start, end) -> Tuple[int, int]:
+        """
+        Index range [first, last) of snippets overlapping [start, end)
+
+        Besides the snippets starting inside the range, the one just before
+        it is included when it runs past `start`.
+        """
+        start_seconds = parse_timestamp(start)
+        end_seconds = parse_timestamp(end)
+        first = bisect_left(self.starts, start_seconds)
+        if first > 0 and self.starts[first - 1] + self.durations[first - 1] > start_seconds:
+            first -= 1
+        last = max(bisect_left(self.starts, end_seconds), first)
+        return first, last
+
+    def between(self, start, end) -> List:
+        """Snippets overlapping [start, end)"""
+        first, last = self.span(start, end)
+        return [self.transcript[i] for i in range(first, last)]
+
+    def text_between(self, start, end, separator: str = ' ') -> str:
+        return separator.join(snippet['text'] for snippet in self.between(start, end))
+
+    def contains(self, timestamp) -> bool:
+        """Whether `timestamp` lies within the transcript (0 to the end of the last snippet)"""
+        try:
+            seconds = parse_timestamp(timestamp)
+        except ValueError:
+            return False
+        return 0 <= seconds <= self.end
+
+    def link(self, timestamp) -> str:
+        """Deep link to `timestamp`; raises ValueError if it is outside the transcript"""
+        if self.video_id is None:
+            raise ValueError('TranscriptIndex has no video_id')
+        if not self.contains(timestamp):
+            raise ValueError(f"Timestamp {timestamp} is outside the transcript "
+                             f"(00:00-{format_timestamp(self.end)})")
+        return deep_link(self.video_id, parse_timestamp(timestamp))
+
+
+def lookup(result: Dict, at=None, between: Optional[Tuple] = None) -> Dict:
+    """
+    Answer a --at / --between query against a successful get_subtitles() result
+
+    Returns:
+        Dictionary with the matched snippets (each with its [mm:ss] time and
+        deep link) and whether the requested timestamps lie in the transcript
+    """
+    index = TranscriptIndex.from_result(result)
+    if at is not None:
+        snippet = index.at(at)
+        snippets = [snippet] if snippet is not None else []
+        query = {'at': format_timestamp(parse_timestamp(at)), 'valid': index.contains(at)}
+    else:
+        snippets = index.between(*between)
+        query = {'start': format_timestamp(parse_timestamp(between[0])),
+                 'end': format_timestamp(parse_timestamp(between[1])),
+                 'valid': index.contains(between[0]) and index.contains(between[1])}
+    query['video_id'] = result['video_id']
+    query['transcript_end'] = format_timestamp(index.end)
+    query['snippets'] = [
+        {'time': format_timestamp(snippet['start']), 'link': deep_link(result['video_id'], snippet['start']),
+         **dict(snippet)}
+        for snippet in snippets
+    ]
+    return query
+
+
 def format_output(result: Dict, show_full: bool = False) -> str:
     """Format the result for display"""
 
@@ -177,7 +542,10 @@ def format_output(result: Dict, show_full: bool = False) -> str:
         lines.append("📝 Subtitle Text (First 2000 characters):")
         lines.append("=" * 70)
 
-        merged = result['transcript_merged']
+        if 'transcript_merged' in result:
+            merged = result['transcript_merged']
+        else:
+            merged = result['transcript'].merged_text()
         if len(merged) > 2000 and not show_full:
             lines.append(merged[:2000])
             lines.append(f"\n... (truncated, {len(merged) - 2000} more characters)")
@@ -191,10 +559,7 @@ def format_output(result: Dict, show_full: bool = False) -> str:
             lines.append("⏱️  Timestamped Entries (First 10):")
             lines.append("=" * 70)
             for i, entry in enumerate(result['transcript'][:10], 1):
-                start = entry['start']
-                minutes = int(start // 60)
-                seconds = int(start % 60)
-                lines.append(f"[{minutes:02d}:{seconds:02d}] {entry['text']}")
+                lines.append(f"[{format_timestamp(entry['start'])}] {entry['text']}")
 
             if len(result['transcript']) > 10:
                 lines.append(f"\n... and {len(result['transcript']) - 10} more entries")
@@ -217,13 +582,129 @@ def format_output(result: Dict, show_full: bool = False) -> str:
     return '\n'.join(lines)
 
 
+def create_api(pool_size: int = DEFAULT_WORKERS):
+    """YouTubeTranscriptApi over one keep-alive session with `pool_size` pooled connections"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from youtube_transcript_api import YouTubeTranscriptApi
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(pool_size, 1))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return YouTubeTranscriptApi(http_client=session)
+
+
+def load_manifest(path: Path, retry_failed: bool = False) -> set:
+    """Video IDs already handled by an earlier run (failures too, unless retry_failed)"""
+    done = set()
+    if not path.exists():
+        return done
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # line cut short by an interrupted run
+            if entry.get('status') == 'ok' or not retry_failed:
+                done.add(entry['video_id'])
+    return done
+
+
+def iter_batch_ids(lines, skip: set, counts: Optional[Dict] = None):
+    """
+    Yield (video_id or None, input line) for new entries of a URL/ID list
+
+    Entries in `skip` and repeated IDs are left out and counted in
+    counts['skipped'] when `counts` is given.
+    """
+    seen = set()
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            video_id = extract_video_id(line)
+        except ValueError:
+            yield None, line
+            continue
+        if video_id in skip or video_id in seen:
+            if counts is not None:
+                counts['skipped'] += 1
+            continue
+        seen.add(video_id)
+        yield video_id, line
+
+
+def extract_batch(lines, output, manifest_path: Path, languages: List[str],
+                  workers: int = DEFAULT_WORKERS, cache: Optional[TranscriptCache] = None,
+                  refresh: bool = False, retry_failed: bool = False, compact: bool = False) -> Dict:
+    """
+    Extract transcripts for many videos with a pool of worker threads.
+
+    Each result is written to `output` as one JSON line as soon as it is
+    ready, and its video ID and status are appended to the manifest. Videos
+    already in the manifest are skipped, so an interrupted run picks up
+    where it stopped. All workers share one HTTP session. With compact,
+    transcripts are held as CompactTranscript until they are written.
+
+    Returns:
+        Counters: ok, failed, skipped, cached
+    """
+    done = load_manifest(manifest_path, retry_failed)
+    counts = {'ok': 0, 'failed': 0, 'skipped': 0, 'cached': 0}
+    api = create_api(workers)
+
+    with open(manifest_path, 'a', encoding='utf-8') as manifest, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+
+        def record(result: Dict) -> None:
+            output.write(json.dumps(result, ensure_ascii=False, default=json_default) + '\n')
+            output.flush()
+            status = 'ok' if result['success'] else 'error'
+            counts['ok' if result['success'] else 'failed'] += 1
+            counts['cached'] += bool(result.get('cached'))
+            if result.get('video_id'):
+                manifest.write(json.dumps({'video_id': result['video_id'], 'status': status,
+                                           'error': result.get('error')}, ensure_ascii=False) + '\n')
+                manifest.flush()
+            print(f"📦 [{counts['ok'] + counts['failed']}] {result.get('video_id')}: "
+                  f"{'ok' if result['success'] else result.get('error')}", file=sys.stderr)
+
+        in_flight = set()
+        for video_id, line in iter_batch_ids(lines, done, counts):
+            if video_id is None:
+                record({'success': False, 'video_id': None, 'input': line,
+                        'error': f"Could not extract video ID from: {line}"})
+                continue
+            in_flight.add(executor.submit(get_subtitles, video_id, languages, cache, refresh, api, compact))
+            if len(in_flight) >= workers * 2:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    record(future.result())
+        for future in in_flight:
+            record(future.result())
+
+    return counts
+
+
 if __name__ == '__main__':
     import argparse
 
     parser = argparse.ArgumentParser(
         description='Extract YouTube subtitles using youtube-transcript-api'
     )
-    parser.add_argument('url', help='YouTube video URL or ID')
+    parser.add_argument('url', nargs='?', help='YouTube video URL or ID')
+    parser.add_argument('--batch', metavar='FILE',
+                        help="Extract every URL/ID listed in FILE ('-' for stdin), one JSON line per video")
+    parser.add_argument('--output', '-o', help='With --batch: JSONL output file (default: stdout)')
+    parser.add_argument('--manifest', help='With --batch: progress manifest for resuming '
+                                           '(default: <output>.manifest, or <FILE>.manifest when '
+                                           'writing to stdout; required for stdin to stdout)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'With --batch: concurrent fetches (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='With --batch: retry videos that failed in an earlier run')
     parser.add_argument(
         '--language',
         action='append',
@@ -231,17 +712,72 @@ if __name__ == '__main__':
     )
     parser.add_argument('--json', action='store_true', help='Output raw JSON')
     parser.add_argument('--full', action='store_true', help='Show full text without truncation')
+    parser.add_argument('--refresh', action='store_true', help='Fetch again even if the transcript is cached')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the transcript cache')
+    parser.add_argument('--cache-path', default=str(DEFAULT_CACHE_PATH),
+                        help=f'Transcript cache database (default: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_CACHE_MAX_BYTES / 1024 / 1024,
+                        help='Evict least recently used transcripts above this size (default: 256)')
+    parser.add_argument('--compact-out', metavar='FILE',
+                        help='Also save the transcript in the compact binary format (memory-mappable)')
+    parser.add_argument('--compact', action='store_true',
+                        help='Hold transcripts as CompactTranscript (less memory for long videos); '
+                             'JSON output then has no transcript_merged')
+    parser.add_argument('--at', metavar='TIME',
+                        help="Show the snippet at TIME ('12:34', '754', '&t=754s') with its deep link")
+    parser.add_argument('--between', nargs=2, metavar=('START', 'END'),
+                        help="Show the snippets between START and END (e.g. 10:00 15:00)")
 
     args = parser.parse_args()
+    if not args.url and not args.batch:
+        parser.error('a YouTube URL/ID or --batch FILE is required')
+    if args.batch == '-' and not args.output and not args.manifest:
+        parser.error('--manifest is required when reading --batch from stdin and writing to stdout')
 
     # Use provided languages or default to Korean and English
     languages = args.language if args.language else ['ko', 'en']
 
     try:
-        result = get_subtitles(args.url, languages)
+        cache = None if args.no_cache else TranscriptCache(args.cache_path, int(args.cache_max_mb * 1024 * 1024))
+
+        if args.batch:
+            manifest_path = Path(args.manifest or f"{args.output or args.batch}.manifest")
+            infile = sys.stdin if args.batch == '-' else open(args.batch, encoding='utf-8')
+            output = open(args.output, 'a', encoding='utf-8') if args.output else sys.stdout
+            start = time.perf_counter()
+            try:
+                counts = extract_batch(infile, output, manifest_path, languages, workers=args.workers,
+                                       cache=cache, refresh=args.refresh, retry_failed=args.retry_failed,
+                                       compact=args.compact)
+            finally:
+                if infile is not sys.stdin:
+                    infile.close()
+                if output is not sys.stdout:
+                    output.close()
+            print(f"✅ {counts['ok']} ok ({counts['cached']} from cache), {counts['failed']} failed, "
+                  f"{counts['skipped']} skipped from {manifest_path} in {time.perf_counter() - start:.1f}s",
+                  file=sys.stderr)
+            sys.exit(0 if counts['failed'] == 0 else 1)
+
+        result = get_subtitles(args.url, languages, cache=cache, refresh=args.refresh, compact=args.compact)
+
+        if args.compact_out and result['success']:
+            CompactTranscript.from_snippets(result['transcript']).save(args.compact_out)
+            print(f"💾 Saved compact transcript: {args.compact_out}", file=sys.stderr)
+
+        if (args.at or args.between) and result['success']:
+            query = lookup(result, at=args.at, between=args.between)
+            if args.json:
+                print(json.dumps(query, indent=2, ensure_ascii=False, default=json_default))
+            else:
+                if not query['valid']:
+                    print(f"⚠️  Outside the transcript (00:00-{query['transcript_end']})")
+                for snippet in query['snippets']:
+                    print(f"[{snippet['time']}] {snippet['text']}  {snippet['link']}")
+            sys.exit(0 if query['snippets'] else 1)
 
         if args.json:
-            print(json.dumps(result, indent=2, ensure_ascii=False))
+            print(json.dumps(result, indent=2, ensure_ascii=False, default=json_default))
         else:
             print(format_output(result, show_full=args.full))
 
@@ -99,7 +99,12 @@ def format_video_info_for_prompt(video_info: Optional[Dict]) -> str:
             lines.append(f"채널: {channel.get('name', 'N/A')}")
         else:
             lines.append(f"채널: {channel}")
-    if 'duration' in video_info:
+    if video_info.get('duration_seconds') is not None:
+        hours, rest = divmod(video_info['duration_seconds'], 3600)
+        minutes, seconds = divmod(rest, 60)
+        duration = f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+        lines.append(f"재생시간: {duration}")
+    elif 'duration' in video_info:
         lines.append(f"재생시간: {video_info['duration']}")
     if 'statistics' in video_info:
         stats = video_info['statistics']
@@ -87,7 +87,9 @@ def get_video_info(youtube_url: str) -> Optional[Dict]:
             'python',
             str(script_path),
             youtube_url,
-            '--json'
+            '--json',
+            # Only what format_video_info_for_prompt() uses
+            '--fields', 'title,description,channel,duration,statistics'
         ]
 
         result = subprocess.run(
@@ -178,8 +180,13 @@ def generate_summary(
     return result.stdout
 
 
-def send_to_discord(summary_text: str) -> bool:
-    """Send summary to Discord (optional)"""
+def send_to_discord(summary_text: str, queue: bool = False) -> bool:
+    """Send summary to Discord (optional)
+
+    With queue=True the summary is only spooled in the discord-sender outbox,
+    so a Discord outage does not hold up the pipeline; the outbox worker
+    (send_message.py --worker) delivers it later.
+    """
 
     print("\n" + "=" * 70)
     print("📤 STEP 3: Discord 전송")
@@ -188,20 +195,24 @@ def send_to_discord(summary_text: str) -> bool:
     try:
         script_path = find_script('send_message.py', 'discord-sender')
 
+        # Pass the summary on stdin: long summaries can exceed the argv size limit
         cmd = [
             'python',
             str(script_path),
-            summary_text
+            '-'
         ]
+        if queue:
+            cmd.append('--enqueue')
 
         result = subprocess.run(
             cmd,
+            input=summary_text,
             capture_output=True,
             text=True
         )
 
         if result.returncode == 0:
-            print("✅ Discord 전송 성공!")
+            print("📥 Discord 아웃박스에 등록!" if queue else "✅ Discord 전송 성공!")
             print(result.stdout)
             return True
         else:
@@ -225,6 +236,9 @@ def main():
   # 요약만 생성하고 Discord는 전송하지 않음
   python summarize_youtube.py "VIDEO_URL" --no-discord
 
+  # Discord 전송을 아웃박스에 맡기고 바로 종료 (send_message.py --worker가 전송)
+  python summarize_youtube.py "VIDEO_URL" --discord-queue
+
   # 영어 자막으로 요약
   python summarize_youtube.py "VIDEO_URL" --language en
 
@@ -258,6 +272,11 @@ def main():
         action='store_true',
         help='Discord 전송 건너뛰기'
     )
+    parser.add_argument(
+        '--discord-queue',
+        action='store_true',
+        help='Discord로 바로 보내지 않고 아웃박스에 등록 (장애 시에도 대기하지 않음)'
+    )
     parser.add_argument(
         '--with-video-info',
         action='store_true',
@@ -293,7 +312,7 @@ def main():
 
         # Step 3: Send to Discord (optional)
         if not args.no_discord:
-            send_to_discord(summary_text)
+            send_to_discord(summary_text, queue=args.discord_queue)
         else:
             print("\n⏭️  Discord 전송 건너뜀")
 
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+YouTube Thumbnail Downloader
+
+Downloads the best thumbnail of many videos concurrently. Files are stored
+content-addressed (by SHA-256) so identical images are kept once, and
+thumbnails downloaded by an earlier run are not fetched again.
+
+Input is either JSONL produced by get_video_info.py (anything with a
+`thumbnails` map) or video/playlist/channel URLs and IDs, one per line,
+whose thumbnails are looked up with the YouTube Data API.
+
+Usage:
+    python download_thumbnails.py <file_or_-> [--out DIR] [--max-width N]
+
+Example:
+    python get_video_info.py --batch urls.txt --fields thumbnails | python download_thumbnails.py -
+    python download_thumbnails.py video_urls.txt --out thumbs --max-width 640
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    print("Error: 'requests' library is not installed.", file=sys.stderr)
+    print("Please install it using: pip install requests", file=sys.stderr)
+    sys.exit(1)
+
+from get_video_info import (
+    ApiKeyPool, QuotaExhausted, QuotaLedger, VideoCache, iter_input_ids, iter_videos_info,
+    load_api_keys, load_env_file
+)
+
+
+DEFAULT_OUT_DIR = Path('thumbnails')
+DEFAULT_MAX_WIDTH = 1280
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+DEFAULT_WORKERS = 8
+INDEX_FILE = 'index.json'
+REQUEST_TIMEOUT = 30
+CHUNK_SIZE = 64 * 1024
+
+
+def rank_thumbnails(thumbnails, max_width=DEFAULT_MAX_WIDTH):
+    """
+    Order thumbnails by preference: widest first among those no wider than
+    `max_width`, then the wider ones from the smallest up
+
+    Returns:
+        list: {'url', 'width', 'height'} entries
+    """
+    candidates = [thumb for thumb in (thumbnails or {}).values() if thumb.get('url')]
+    fitting = [thumb for thumb in candidates if thumb.get('width', 0) <= max_width]
+    wider = [thumb for thumb in candidates if thumb.get('width', 0) > max_width]
+    return (sorted(fitting, key=lambda thumb: thumb.get('width', 0), reverse=True) +
+            sorted(wider, key=lambda thumb: thumb.get('width', 0)))
+
+
+class ThumbnailStore:
+    """
+    Content-addressed image store: <dir>/<sha[:2]>/<sha>.<ext>
+
+    An index (URL -> SHA-256) is kept in <dir>/index.json so URLs that were
+    downloaded before are served without a request. Thread-safe.
+    """
+
+    def __init__(self, root=DEFAULT_OUT_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / INDEX_FILE
+        self._lock = threading.Lock()
+        self.index = {}
+        if self.index_path.exists():
+            with open(self.index_path, encoding='utf-8') as f:
+                self.index = json.load(f)
+
+    def path_for(self, digest, ext):
+        return self.root / digest[:2] / f"{digest}{ext}"
+
+    def lookup(self, url):
+        """Return the stored path for `url`, or None if it must be downloaded"""
+        with self._lock:
+            entry = self.index.get(url)
+        if entry:
+            path = self.root / entry
+            if path.exists():
+                return path
+        return None
+
+    def add(self, url, data, ext):
+        """
+        Store downloaded bytes
+
+        Returns:
+            tuple: (path, duplicate) where duplicate means the same content
+            was already stored under another URL
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest, ext)
+        duplicate = path.exists()
+        if not duplicate:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.part')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        with self._lock:
+            self.index[url] = str(path.relative_to(self.root))
+        return path, duplicate
+
+    def save_index(self):
+        with self._lock:
+            tmp = self.index_path.with_suffix('.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f)
+            os.replace(tmp, self.index_path)
+
+
+def create_session(pool_size=DEFAULT_WORKERS):
+    """Keep-alive session with enough pooled connections for every worker"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(pool_size, 1))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def download_thumbnail(video_info, store, session, max_width=DEFAULT_MAX_WIDTH,
+                       max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Download the best thumbnail of one video into `store`
+
+    The widest thumbnail up to `max_width` is tried first; if it is larger
+    than `max_bytes` the next smaller one is used.
+
+    Returns:
+        dict: video_id, url, path, bytes and status ('downloaded',
+        'cached', 'duplicate') or an 'error'
+    """
+    video_id = video_info.get('video_id')
+    if 'error' in video_info:
+        return {'video_id': video_id, 'error': video_info['error']}
+
+    ranked = rank_thumbnails(video_info.get('thumbnails'), max_width)
+    if not ranked:
+        return {'video_id': video_id, 'error': 'No thumbnails'}
+
+    # Fall back to the next smaller size when an image is over max_bytes
+    for thumb in ranked:
+        result = fetch_into_store(thumb['url'], store, session, max_bytes)
+        if result.get('error') != 'too large':
+            break
+    result = dict({'video_id': video_id, 'url': thumb['url'], 'width': thumb.get('width'),
+                   'height': thumb.get('height')}, **result)
+    if result.get('error') == 'too large':
+        result['error'] = f"Every thumbnail is larger than {max_bytes} bytes"
+    return result
+
+
+def fetch_into_store(url, store, session, max_bytes=DEFAULT_MAX_BYTES):
+    """Download `url` into `store` unless it is already there"""
+    path = store.lookup(url)
+    if path is not None:
+        return {'path': str(path), 'bytes': 0, 'status': 'cached'}
+
+    try:
+        with session.get(url, stream=True, timeout=REQUEST_TIMEOUT) as response:
+            response.raise_for_status()
+            if int(response.headers.get('Content-Length') or 0) > max_bytes:
+                return {'error': 'too large'}
+            data = bytearray()
+            for block in response.iter_content(CHUNK_SIZE):
+                data.extend(block)
+                if len(data) > max_bytes:
+                    return {'error': 'too large'}
+    except requests.exceptions.RequestException as e:
+        return {'error': f"Download failed: {str(e)}"}
+
+    ext = os.path.splitext(url.split('?', 1)[0])[1] or '.jpg'
+    path, duplicate = store.add(url, bytes(data), ext)
+    return {'path': str(path), 'bytes': len(data), 'status': 'duplicate' if duplicate else 'downloaded'}
+
+
+def download_thumbnails(videos, store, workers=DEFAULT_WORKERS, max_width=DEFAULT_MAX_WIDTH,
+                        max_bytes=DEFAULT_MAX_BYTES, session=None):
+    """
+    Download thumbnails for an iterable of video info dicts concurrently
+
+    Results are yielded in input order. At most `workers` * 2 videos are in
+    flight, so `videos` may be an unbounded generator.
+    """
+    own_session = session is None
+    if own_session:
+        session = create_session(workers)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            in_flight = []
+            for video_info in videos:
+                in_flight.append(executor.submit(download_thumbnail, video_info, store, session,
+                                                 max_width, max_bytes))
+                if len(in_flight) >= workers * 2:
+                    yield in_flight.pop(0).result()
+            for future in in_flight:
+                yield future.result()
+    finally:
+        if own_session:
+            session.close()
+
+
+def iter_video_records(lines, api_key_factory):
+    """
+    Yield video info dicts from JSONL lines, or from URL/ID lines via the API
+
+    The input kind is decided by the first non-blank line.
+    """
+    lines = iter(lines)
+    first = None
+    for line in lines:
+        if line.strip():
+            first = line
+            break
+    if first is None:
+        return
+
+    if first.lstrip().startswith('{'):
+        yield json.loads(first)
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+        return
+
+    api_key = api_key_factory()
+    with requests.Session() as session, VideoCache() as cache:
+        rest = (line for source in ([first], lines) for line in source)
+        video_ids = iter_input_ids(rest, api_key=api_key, session=session)
+        yield from iter_videos_info(video_ids, api_key, session=session, cache=cache,
+                                    fields=['thumbnails'])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Download YouTube thumbnails concurrently into a content-addressed store',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s videos.jsonl
+  %(prog)s video_urls.txt --out thumbs --max-width 640
+  python get_video_info.py "https://www.youtube.com/@handle" --fields thumbnails | %(prog)s -
+        """
+    )
+    parser.add_argument('input', help="get_video_info.py JSONL or URLs/IDs, one per line ('-' for stdin)")
+    parser.add_argument('--out', '-o', default=str(DEFAULT_OUT_DIR),
+                        help=f'Output directory (default: {DEFAULT_OUT_DIR})')
+    parser.add_argument('--max-width', type=int, default=DEFAULT_MAX_WIDTH,
+                        help=f'Largest thumbnail width to pick (default: {DEFAULT_MAX_WIDTH})')
+    parser.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_BYTES,
+                        help=f'Skip images larger than this (default: {DEFAULT_MAX_BYTES})')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Concurrent downloads (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--env-file', help='Path to .env file containing GOOGLE_API_KEY')
+    parser.add_argument('--api-key', help='Google API key(s), comma-separated')
+    args = parser.parse_args()
+
+    def api_key_factory():
+        api_keys = load_api_keys(load_env_file(args.env_file), args.api_key)
+        if not api_keys:
+            print("Error: GOOGLE_API_KEY not found (needed to look up URLs/IDs).", file=sys.stderr)
+            sys.exit(1)
+        return ApiKeyPool(api_keys, QuotaLedger())
+
+    store = ThumbnailStore(args.out)
+    infile = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    counts = {'downloaded': 0, 'cached': 0, 'duplicate': 0, 'failed': 0}
+    total_bytes = 0
+    start = time.perf_counter()
+
+    try:
+        videos = iter_video_records(infile, api_key_factory)
+        for result in download_thumbnails(videos, store, workers=args.workers,
+                                          max_width=args.max_width, max_bytes=args.max_bytes):
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+            if 'error' in result:
+                counts['failed'] += 1
+            else:
+                counts[result['status']] += 1
+                total_bytes += result['bytes']
+    except QuotaExhausted as e:
+        print(f"Warning: Stopped early: {e}", file=sys.stderr)
+    finally:
+        store.save_index()
+        if infile is not sys.stdin:
+            infile.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Downloaded {counts['downloaded']} ({total_bytes / 1024:.1f} KiB) in {elapsed:.2f}s, "
+          f"{counts['cached']} cache hits, {counts['duplicate']} duplicates, {counts['failed']} failed",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -7,11 +7,13 @@ It supports both video URLs and video IDs as input.
 
 Usage:
     python get_video_info.py <video_url_or_id> [--env-file PATH]
+    python get_video_info.py --batch <file_or_-> [--env-file PATH]
 
 Example:
     python get_video_info.py "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
     python get_video_info.py "dQw4w9WgXcQ"
     python get_video_info.py "dQw4w9WgXcQ" --env-file /path/to/.env
+    python get_video_info.py --batch video_urls.txt > videos.jsonl
 """
 
 import os
@@ -19,6 +21,13 @@ import sys
 import json
 import argparse
 import re
+import time
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from itertools import islice
 from urllib.parse import urlparse, parse_qs
 from pathlib import Path
 
@@ -30,6 +39,60 @@ except ImportError:
     sys.exit(1)
 
 
+VIDEOS_API_URL = "https://www.googleapis.com/youtube/v3/videos"
+PLAYLIST_ITEMS_API_URL = "https://www.googleapis.com/youtube/v3/playlistItems"
+CHANNELS_API_URL = "https://www.googleapis.com/youtube/v3/channels"
+DEFAULT_PARTS = 'snippet,statistics,contentDetails,status'
+MAX_BATCH_SIZE = 50  # videos.list accepts up to 50 IDs for the same 1-unit cost
+REQUEST_TIMEOUT = 30
+
+# Output field -> (part, fields of that part requested from the API)
+OUTPUT_FIELDS = {
+    'title': ('snippet', ['title']),
+    'description': ('snippet', ['description']),
+    'channel': ('snippet', ['channelTitle', 'channelId']),
+    'published_at': ('snippet', ['publishedAt']),
+    'duration': ('contentDetails', ['duration']),
+    'statistics': ('statistics', ['viewCount', 'likeCount', 'commentCount']),
+    'tags': ('snippet', ['tags']),
+    'category_id': ('snippet', ['categoryId']),
+    'privacy_status': ('status', ['privacyStatus']),
+    'thumbnails': ('snippet', ['thumbnails']),
+}
+
+ISO_DURATION_REGEX = re.compile(
+    r'^P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?'
+    r'(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+(?:\.\d+)?)S)?)?$'
+)
+
+# Quota units charged per request (https://developers.google.com/youtube/v3/determine_quota_cost)
+UNIT_COSTS = {
+    'videos': 1,
+    'playlistItems': 1,
+    'channels': 1,
+    'search': 100,
+}
+DEFAULT_DAILY_QUOTA = 10000
+DEFAULT_QUOTA_RESERVE = 0.2  # share of each key's budget low-priority jobs leave untouched
+QUOTA_ERROR_REASONS = ('quotaExceeded', 'dailyLimitExceeded')
+QUOTA_TIMEZONE = 'America/Los_Angeles'  # daily quotas reset at midnight Pacific time
+# Used on hosts without a time zone database (no system zoneinfo or tzdata package)
+QUOTA_TIMEZONE_FALLBACK = timezone(timedelta(hours=-8), 'PST')
+DEFAULT_QUOTA_PATH = Path.home() / '.cache' / 'youtube-video-info' / 'quota.sqlite3'
+
+DEFAULT_CACHE_PATH = Path.home() / '.cache' / 'youtube-video-info' / 'videos.sqlite3'
+# How long each part is served from disk before it is revalidated with the API
+DEFAULT_PART_TTLS = {
+    'snippet': 7 * 24 * 3600,
+    'contentDetails': 30 * 24 * 3600,
+    'status': 24 * 3600,
+    'statistics': 3600,
+}
+DEFAULT_PART_TTL = 24 * 3600
+# How long an ID the API did not return (deleted, private) is not asked for again
+DEFAULT_MISSING_TTL = 24 * 3600
+
+
 def load_env_file(env_path=None):
     """Load environment variables from .env file"""
     if env_path is None:
@@ -61,6 +124,209 @@ def load_env_file(env_path=None):
     return env_vars
 
 
+def load_api_keys(env_vars=None, api_key=None):
+    """
+    Collect Google API keys, in order of precedence:
+    --api-key (may be comma-separated), GOOGLE_API_KEYS / GOOGLE_API_KEY in
+    the .env file, then the same variables in the environment.
+    """
+    env_vars = env_vars or {}
+    value = (api_key or env_vars.get('GOOGLE_API_KEYS') or env_vars.get('GOOGLE_API_KEY')
+             or os.environ.get('GOOGLE_API_KEYS') or os.environ.get('GOOGLE_API_KEY'))
+    keys = [key.strip() for key in (value or '').split(',') if key.strip()]
+    return list(dict.fromkeys(keys))
+
+
+class QuotaExhausted(Exception):
+    """Every key in the pool has used up its daily quota"""
+
+
+class QuotaDeferred(QuotaExhausted):
+    """A low-priority request was held back to keep the quota reserve"""
+
+
+_quota_timezone = None
+
+
+def quota_timezone():
+    """
+    Time zone of the quota day, resolved on first use.
+
+    Falls back to a fixed UTC-8 offset when QUOTA_TIMEZONE cannot be
+    loaded, so the day may then roll over an hour late during daylight
+    saving time.
+    """
+    global _quota_timezone
+    if _quota_timezone is None:
+        try:
+            _quota_timezone = ZoneInfo(QUOTA_TIMEZONE)
+        except ZoneInfoNotFoundError:
+            print(f"Warning: time zone {QUOTA_TIMEZONE} not found (install tzdata); "
+                  f"using UTC-8 for quota days", file=sys.stderr)
+            _quota_timezone = QUOTA_TIMEZONE_FALLBACK
+    return _quota_timezone
+
+
+class QuotaLedger:
+    """
+    Per-key daily quota usage, stored in SQLite so it survives across runs.
+
+    Keys are stored as SHA-256 digests, never in clear text. Days follow
+    Pacific time, when YouTube Data API quotas reset.
+    """
+
+    def __init__(self, path=DEFAULT_QUOTA_PATH):
+        self.path = Path(path)
+        if str(path) != ':memory:':
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS usage ('
+            ' key_hash TEXT NOT NULL,'
+            ' day TEXT NOT NULL,'
+            ' units INTEGER NOT NULL DEFAULT 0,'
+            ' exhausted INTEGER NOT NULL DEFAULT 0,'
+            ' PRIMARY KEY (key_hash, day))'
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def key_hash(key):
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def today():
+        return datetime.now(quota_timezone()).strftime('%Y-%m-%d')
+
+    def usage(self, key):
+        """Return (units used today, whether the API reported the key exhausted)"""
+        row = self.conn.execute(
+            'SELECT units, exhausted FROM usage WHERE key_hash = ? AND day = ?',
+            (self.key_hash(key), self.today())
+        ).fetchone()
+        return (row[0], bool(row[1])) if row else (0, False)
+
+    def charge(self, key, units):
+        self.conn.execute(
+            'INSERT INTO usage (key_hash, day, units) VALUES (?, ?, ?) '
+            'ON CONFLICT (key_hash, day) DO UPDATE SET units = units + excluded.units',
+            (self.key_hash(key), self.today(), units)
+        )
+        self.conn.commit()
+
+    def mark_exhausted(self, key):
+        self.conn.execute(
+            'INSERT INTO usage (key_hash, day, exhausted) VALUES (?, ?, 1) '
+            'ON CONFLICT (key_hash, day) DO UPDATE SET exhausted = 1',
+            (self.key_hash(key), self.today())
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class ApiKeyPool:
+    """
+    Spread YouTube Data API calls over several keys within their daily quota.
+
+    Every request is charged to the QuotaLedger at its UNIT_COSTS price and
+    sent with the key that has the most quota left. A key the API reports as
+    over quota (403 quotaExceeded) is retired for the day and the request is
+    retried with the next one. With low_priority=True, keys stop being used
+    once only `reserve` of their budget is left and QuotaDeferred is raised
+    instead, so bulk jobs never eat into quota interactive lookups need.
+    Pass it anywhere an api_key string is accepted.
+    """
+
+    def __init__(self, keys, ledger=None, daily_quota=DEFAULT_DAILY_QUOTA,
+                 reserve=DEFAULT_QUOTA_RESERVE, low_priority=False):
+        if isinstance(keys, str):
+            keys = [keys]
+        if not keys:
+            raise ValueError('ApiKeyPool needs at least one API key')
+        self.keys = list(keys)
+        self.ledger = ledger or QuotaLedger(':memory:')
+        self.daily_quota = daily_quota
+        self.reserve = reserve
+        self.low_priority = low_priority
+        self.rotations = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, endpoint):
+        """Return the key to use for one `endpoint` request."""
+        cost = UNIT_COSTS.get(endpoint, 1)
+        floor = self.daily_quota * self.reserve if self.low_priority else 0
+        with self._lock:
+            remaining = {}
+            for key in self.keys:
+                used, exhausted = self.ledger.usage(key)
+                if not exhausted:
+                    remaining[key] = self.daily_quota - used
+            usable = [key for key, left in remaining.items() if left - cost >= floor]
+            if usable:
+                return max(usable, key=remaining.get)
+
+        if any(left >= cost for left in remaining.values()):
+            raise QuotaDeferred(f'Deferred: only the reserved {self.reserve:.0%} of the daily quota is left')
+        raise QuotaExhausted(f'Daily quota exhausted for all {len(self.keys)} API key(s)')
+
+    def charge(self, key, endpoint):
+        with self._lock:
+            self.ledger.charge(key, UNIT_COSTS.get(endpoint, 1))
+
+    def exhaust(self, key):
+        """Retire `key` until the quota resets."""
+        with self._lock:
+            self.ledger.mark_exhausted(key)
+            self.rotations += 1
+
+    def stats(self):
+        """Units used today per key (by position) and the number of rotations."""
+        used = [self.ledger.usage(key) for key in self.keys]
+        return {
+            'keys': len(self.keys),
+            'units_used': [units for units, _ in used],
+            'exhausted': sum(1 for _, exhausted in used if exhausted),
+            'rotations': self.rotations,
+        }
+
+
+def _is_quota_error(response):
+    if response.status_code != 403:
+        return False
+    try:
+        errors = response.json().get('error', {}).get('errors', [])
+    except ValueError:
+        return False
+    return any(error.get('reason') in QUOTA_ERROR_REASONS for error in errors)
+
+
+def api_get(url, params, api_key, session=None, headers=None):
+    """
+    GET a YouTube Data API endpoint with `api_key` (a key string or ApiKeyPool)
+
+    With a pool, the request is charged to the quota ledger and retried
+    with another key when the API answers quotaExceeded.
+    """
+    endpoint = url.rsplit('/', 1)[-1]
+    while True:
+        key = api_key.acquire(endpoint) if isinstance(api_key, ApiKeyPool) else api_key
+        response = (session or requests).get(url, params=dict(params, key=key), headers=headers or {},
+                                             timeout=REQUEST_TIMEOUT)
+        if not isinstance(api_key, ApiKeyPool):
+            return response
+
+        api_key.charge(key, endpoint)
+        if _is_quota_error(response):
+            print(f"Warning: API key #{api_key.keys.index(key) + 1} is over quota, rotating",
+                  file=sys.stderr)
+            api_key.exhaust(key)
+            continue
+        return response
+
+
 def extract_video_id(url_or_id):
     """
     Extract video ID from YouTube URL or return the ID if already provided.
@@ -94,63 +360,515 @@ def extract_video_id(url_or_id):
     return None
 
 
-def get_video_info(video_id, api_key):
+def extract_collection(url):
     """
-    Fetch video information from YouTube Data API v3
+    Recognize playlist and channel URLs
+
+    Supports formats:
+    - https://www.youtube.com/playlist?list=PLAYLIST_ID
+    - https://www.youtube.com/channel/CHANNEL_ID
+    - https://www.youtube.com/@handle
+    - https://www.youtube.com/user/USERNAME
+    - https://www.youtube.com/c/NAME (resolved as a handle)
 
     Returns:
-        dict: Video information including title, description, statistics, etc.
+        tuple: ('playlist', id), ('channel', id), ('handle', name),
+        ('username', name), or None if `url` is not a playlist/channel URL
+    """
+    try:
+        parsed_url = urlparse(url)
+    except Exception:
+        return None
+    if 'youtube.com' not in parsed_url.netloc:
+        return None
+
+    segments = [segment for segment in parsed_url.path.split('/') if segment]
+    if not segments:
+        return None
+    if segments[0] == 'playlist':
+        playlist_id = parse_qs(parsed_url.query).get('list')
+        return ('playlist', playlist_id[0]) if playlist_id else None
+    if segments[0].startswith('@'):
+        return ('handle', segments[0])
+    if len(segments) > 1 and segments[0] == 'channel':
+        return ('channel', segments[1])
+    if len(segments) > 1 and segments[0] == 'user':
+        return ('username', segments[1])
+    if len(segments) > 1 and segments[0] == 'c':
+        return ('handle', '@' + segments[1])
+    return None
+
+
+def resolve_uploads_playlist(kind, value, api_key, session=None):
+    """
+    Return the uploads playlist ID of a channel
+
+    Channel IDs map to their uploads playlist directly (UC... -> UU...);
+    handles and usernames need one channels.list call.
     """
-    base_url = "https://www.googleapis.com/youtube/v3/videos"
+    if kind == 'channel' and value.startswith('UC'):
+        return 'UU' + value[2:]
 
+    params = {'part': 'contentDetails', 'fields': 'items(contentDetails/relatedPlaylists/uploads)'}
+    params.update({'channel': {'id': value}, 'handle': {'forHandle': value},
+                   'username': {'forUsername': value}}[kind])
+    response = api_get(CHANNELS_API_URL, params, api_key, session=session)
+    response.raise_for_status()
+    items = response.json().get('items', [])
+    if not items:
+        raise ValueError(f"Channel not found: {value}")
+    return items[0]['contentDetails']['relatedPlaylists']['uploads']
+
+
+def iter_playlist_video_ids(playlist_id, api_key, session=None):
+    """
+    Yield the video IDs of a playlist, one playlistItems page (50 IDs) at a time
+
+    Pages are requested lazily with pageToken, so memory stays constant
+    and the first IDs are available after the first request.
+    """
     params = {
-        'part': 'snippet,statistics,contentDetails,status',
-        'id': video_id,
-        'key': api_key
+        'part': 'contentDetails',
+        'playlistId': playlist_id,
+        'maxResults': MAX_BATCH_SIZE,
+        'fields': 'nextPageToken,items(contentDetails/videoId)'
     }
-
-    try:
-        response = requests.get(base_url, params=params)
+    while True:
+        response = api_get(PLAYLIST_ITEMS_API_URL, params, api_key, session=session)
         response.raise_for_status()
-
         data = response.json()
+        for item in data.get('items', []):
+            video_id = item.get('contentDetails', {}).get('videoId')
+            if video_id:
+                yield video_id
+        if not data.get('nextPageToken'):
+            return
+        params['pageToken'] = data['nextPageToken']
+
+
+def parse_duration(duration):
+    """
+    Convert an ISO 8601 duration (e.g. 'PT1H2M3S') to seconds
+
+    Returns:
+        int: Number of seconds, or None if `duration` is not a valid duration
+    """
+    match = ISO_DURATION_REGEX.match(duration or '')
+    if not match or duration in ('P', 'PT'):
+        return None
+    parts = {name: float(value) for name, value in match.groupdict().items() if value}
+    return int(parts.get('weeks', 0) * 604800 + parts.get('days', 0) * 86400 +
+               parts.get('hours', 0) * 3600 + parts.get('minutes', 0) * 60 + parts.get('seconds', 0))
+
+
+def build_projection(parts=None, fields=None):
+    """
+    Work out which parts and part fields to request
+
+    Args:
+        parts: Iterable of API parts to include (default: all of DEFAULT_PARTS)
+        fields: Iterable of output fields (keys of OUTPUT_FIELDS) to include
+
+    Returns:
+        tuple: (output fields, {part: API fields or None for the whole part})
+    """
+    parts = list(parts or DEFAULT_PARTS.split(','))
+    unknown = [part for part in parts if part not in DEFAULT_PARTS.split(',')]
+    if unknown:
+        raise ValueError(f"Unknown part(s): {', '.join(unknown)}")
+
+    if fields is None:
+        selected = [field for field, (part, _) in OUTPUT_FIELDS.items() if part in parts]
+        return selected, {part: None for part in parts}
+
+    unknown = [field for field in fields if field not in OUTPUT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)} (choose from {', '.join(OUTPUT_FIELDS)})")
+
+    selected = [field for field in OUTPUT_FIELDS if field in fields and OUTPUT_FIELDS[field][0] in parts]
+    projection = {}
+    for field in selected:
+        part, api_fields = OUTPUT_FIELDS[field]
+        projection.setdefault(part, []).extend(api_fields)
+    return selected, projection
+
+
+def part_spec(part, api_fields):
+    """API `fields` syntax for one part, e.g. 'snippet(title,channelTitle)'"""
+    return part if api_fields is None else f"{part}({','.join(api_fields)})"
+
+
+def format_video(video, fields=None):
+    """
+    Convert one item of a videos.list response into the output dict
+
+    Args:
+        video: Item of a videos.list response
+        fields: Output fields to include (default: all of OUTPUT_FIELDS)
+    """
+    video_id = video.get('id')
+    snippet = video.get('snippet', {})
+    statistics = video.get('statistics', {})
+    content_details = video.get('contentDetails', {})
+    status = video.get('status', {})
+
+    duration = content_details.get('duration', 'N/A')
+    values = {
+        'title': lambda: snippet.get('title', 'N/A'),
+        'description': lambda: snippet.get('description', 'N/A'),
+        'channel': lambda: {
+            'name': snippet.get('channelTitle', 'N/A'),
+            'id': snippet.get('channelId', 'N/A')
+        },
+        'published_at': lambda: snippet.get('publishedAt', 'N/A'),
+        'duration': lambda: duration,
+        'statistics': lambda: {
+            'view_count': int(statistics.get('viewCount', 0)),
+            'like_count': int(statistics.get('likeCount', 0)),
+            'comment_count': int(statistics.get('commentCount', 0))
+        },
+        'tags': lambda: snippet.get('tags', []),
+        'category_id': lambda: snippet.get('categoryId', 'N/A'),
+        'privacy_status': lambda: status.get('privacyStatus', 'N/A'),
+        'thumbnails': lambda: snippet.get('thumbnails', {}),
+    }
+
+    result = {
+        'video_id': video_id,
+        'url': f"https://www.youtube.com/watch?v={video_id}",
+    }
+    for field in (fields or OUTPUT_FIELDS):
+        result[field] = values[field]()
+        if field == 'duration':
+            result['duration_seconds'] = parse_duration(duration)
+    return result
+
+
+class VideoCache:
+    """
+    On-disk videos.list response cache backed by SQLite.
+
+    Each part of each video (snippet, statistics, ...) is stored separately
+    with its own fetch time, so parts expire on their own TTL: fresh parts
+    are served without any request. The ETag of every response is kept per
+    (video IDs, parts) request; when that request (or the stale subset of
+    it) is due again, it is sent with If-None-Match and a 304 is answered
+    from disk. IDs the API did not return are remembered for `missing_ttl`
+    seconds so they neither trigger requests nor block revalidation.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttls=None, missing_ttl=DEFAULT_MISSING_TTL):
+        self.path = Path(path)
+        self.ttls = dict(DEFAULT_PART_TTLS, **(ttls or {}))
+        self.missing_ttl = missing_ttl
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+        if str(path) != ':memory:':
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS parts ('
+            ' video_id TEXT NOT NULL,'
+            ' part TEXT NOT NULL,'
+            ' data TEXT NOT NULL,'
+            ' fetched_at REAL NOT NULL,'
+            ' PRIMARY KEY (video_id, part))'
+        )
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS etags ('
+            ' request_key TEXT PRIMARY KEY,'
+            ' etag TEXT NOT NULL,'
+            ' fetched_at REAL NOT NULL)'
+        )
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS missing ('
+            ' video_id TEXT PRIMARY KEY,'
+            ' checked_at REAL NOT NULL)'
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def request_key(video_ids, parts):
+        return ','.join(video_ids) + '|' + ','.join(sorted(parts))
+
+    @staticmethod
+    def part_name(spec):
+        """'snippet(title)' -> 'snippet'"""
+        return spec.split('(', 1)[0]
+
+    def _ttl(self, spec):
+        return self.ttls.get(self.part_name(spec), DEFAULT_PART_TTL)
+
+    def lookup(self, video_id, parts):
+        """
+        Return (item, stale_parts): the cached parts as a videos.list item
+        (or None if nothing is stored) and the parts that must be refetched.
+
+        Parts are given as part specs (see part_spec()), so a projected
+        'snippet(title)' entry is never served for a full 'snippet' request.
+        """
+        now = time.time()
+        rows = self.conn.execute(
+            f'SELECT part, data, fetched_at FROM parts WHERE video_id = ? '
+            f'AND part IN ({",".join("?" * len(parts))})',
+            (video_id, *parts)
+        ).fetchall()
+
+        item = {'id': video_id}
+        stale = set(parts)
+        for part, data, fetched_at in rows:
+            item[self.part_name(part)] = json.loads(data)
+            if now - fetched_at <= self._ttl(part):
+                stale.discard(part)
+        return (item if len(item) > 1 else None), stale
+
+    def has_parts(self, video_id, parts):
+        (count,) = self.conn.execute(
+            f'SELECT COUNT(*) FROM parts WHERE video_id = ? AND part IN ({",".join("?" * len(parts))})',
+            (video_id, *parts)
+        ).fetchone()
+        return count == len(parts)
+
+    def is_missing(self, video_id):
+        """Whether the API recently answered without this video"""
+        row = self.conn.execute(
+            'SELECT checked_at FROM missing WHERE video_id = ?', (video_id,)
+        ).fetchone()
+        return row is not None and time.time() - row[0] <= self.missing_ttl
+
+    def mark_missing(self, video_ids):
+        now = time.time()
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO missing (video_id, checked_at) VALUES (?, ?)',
+            [(video_id, now) for video_id in video_ids]
+        )
+        self.conn.commit()
+
+    def get_etag(self, video_ids, parts):
+        row = self.conn.execute(
+            'SELECT etag FROM etags WHERE request_key = ?', (self.request_key(video_ids, parts),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def store(self, items, video_ids, parts, etag=None):
+        """Store the parts of freshly fetched items and the response ETag."""
+        now = time.time()
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO parts (video_id, part, data, fetched_at) VALUES (?, ?, ?, ?)',
+            [(item['id'], part, json.dumps(item[self.part_name(part)], ensure_ascii=False), now)
+             for item in items for part in parts if self.part_name(part) in item]
+        )
+        self.conn.executemany('DELETE FROM missing WHERE video_id = ?', [(item['id'],) for item in items])
+        if etag:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO etags (request_key, etag, fetched_at) VALUES (?, ?, ?)',
+                (self.request_key(video_ids, parts), etag, now)
+            )
+        self.conn.commit()
+
+    def touch(self, video_ids, parts):
+        """Mark stored parts as fresh again after a 304 Not Modified."""
+        now = time.time()
+        self.conn.executemany(
+            'UPDATE parts SET fetched_at = ? WHERE video_id = ? AND part = ?',
+            [(now, video_id, part) for video_id in video_ids for part in parts]
+        )
+        self.conn.commit()
+
+    def stats(self):
+        """Return hit counters and the number of cached videos."""
+        (videos,) = self.conn.execute('SELECT COUNT(DISTINCT video_id) FROM parts').fetchone()
+        return {'hits': self.hits, 'revalidated': self.revalidated, 'misses': self.misses,
+                'videos': videos}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
 
-        if 'items' not in data or len(data['items']) == 0:
-            return {'error': 'Video not found or API key is invalid'}
-
-        video = data['items'][0]
-        snippet = video.get('snippet', {})
-        statistics = video.get('statistics', {})
-        content_details = video.get('content_details', {})
-        status = video.get('status', {})
-
-        # Format the output
-        result = {
-            'video_id': video_id,
-            'url': f"https://www.youtube.com/watch?v={video_id}",
-            'title': snippet.get('title', 'N/A'),
-            'description': snippet.get('description', 'N/A'),
-            'channel': {
-                'name': snippet.get('channelTitle', 'N/A'),
-                'id': snippet.get('channelId', 'N/A')
-            },
-            'published_at': snippet.get('publishedAt', 'N/A'),
-            'duration': content_details.get('duration', 'N/A'),
-            'statistics': {
-                'view_count': int(statistics.get('viewCount', 0)),
-                'like_count': int(statistics.get('likeCount', 0)),
-                'comment_count': int(statistics.get('commentCount', 0))
-            },
-            'tags': snippet.get('tags', []),
-            'category_id': snippet.get('categoryId', 'N/A'),
-            'privacy_status': status.get('privacyStatus', 'N/A'),
-            'thumbnails': snippet.get('thumbnails', {})
+def get_videos_info(video_ids, api_key, session=None, cache=None, parts=None, fields=None):
+    """
+    Fetch information for up to MAX_BATCH_SIZE videos with a single API call
+
+    Args:
+        video_ids: List of video IDs (at most MAX_BATCH_SIZE)
+        api_key: YouTube Data API key or ApiKeyPool
+        session: Optional requests.Session to reuse connections
+        cache: Optional VideoCache; fresh videos are served from disk and
+            stale ones are revalidated with If-None-Match
+        parts: API parts to request (default: DEFAULT_PARTS)
+        fields: Output fields to return (see OUTPUT_FIELDS); only the API
+            fields they need are requested via the `fields` parameter
+
+    Returns:
+        list: One dict per requested ID, in input order. IDs the API did not
+        return (deleted, private or invalid) get an 'error' entry.
+
+    Raises:
+        QuotaExhausted: The ApiKeyPool has no quota left (QuotaDeferred for
+            a low-priority pool that reached its reserve)
+    """
+    if len(video_ids) > MAX_BATCH_SIZE:
+        raise ValueError(f"At most {MAX_BATCH_SIZE} video IDs per request, got {len(video_ids)}")
+
+    output_fields, projection = build_projection(parts, fields)
+    specs = [part_spec(part, api_fields) for part, api_fields in projection.items()]
+    found = {}
+    pending = list(video_ids)
+    stale_specs = specs
+
+    if cache is not None:
+        pending, stale_specs = [], set()
+        for video_id in dict.fromkeys(video_ids):
+            if cache.is_missing(video_id):
+                cache.hits += 1
+                continue
+            item, stale = cache.lookup(video_id, specs)
+            if stale:
+                pending.append(video_id)
+                stale_specs |= stale
+            else:
+                found[video_id] = format_video(item, output_fields)
+                cache.hits += 1
+        stale_specs = sorted(stale_specs, key=specs.index)
+
+    if pending:
+        request_specs = stale_specs
+        headers = {}
+        etag = None
+        if cache is not None:
+            # An ETag only validates the exact request it came from: revalidate
+            # the stale parts if that request was made before, otherwise the
+            # full request (e.g. the first statistics refresh after a full fetch)
+            for candidate in (stale_specs, specs):
+                if all(cache.has_parts(video_id, candidate) for video_id in pending):
+                    etag = cache.get_etag(pending, candidate)
+                    if etag:
+                        request_specs = candidate
+                        headers['If-None-Match'] = etag
+                        break
+
+        params = {
+            'part': ','.join(VideoCache.part_name(spec) for spec in request_specs),
+            'id': ','.join(pending)
         }
+        if fields is not None:
+            params['fields'] = f"etag,items(id,{','.join(request_specs)})"
+
+        try:
+            response = api_get(VIDEOS_API_URL, params, api_key, session=session, headers=headers)
+            if response.status_code == 304 and etag:
+                cache.touch(pending, request_specs)
+                cache.revalidated += len(pending)
+                items = [cache.lookup(video_id, specs)[0] for video_id in pending]
+            else:
+                response.raise_for_status()
+                data = response.json()
+                items = data.get('items', [])
+                if cache is not None:
+                    cache.misses += len(pending)
+                    cache.store(items, pending, request_specs, etag=data.get('etag'))
+                    returned = {item.get('id') for item in items}
+                    cache.mark_missing([video_id for video_id in pending if video_id not in returned])
+                    # Merge with the fresh parts that were not requested again
+                    items = [cache.lookup(item['id'], specs)[0] for item in items]
+        except (requests.exceptions.RequestException, ValueError) as e:
+            error = f'API request failed: {str(e)}'
+            return [found.get(video_id) or {'video_id': video_id, 'error': error} for video_id in video_ids]
+
+        found.update((item.get('id'), format_video(item, output_fields)) for item in items)
+
+    return [
+        found.get(video_id) or {'video_id': video_id, 'error': 'Video not found or API key is invalid'}
+        for video_id in video_ids
+    ]
 
-        return result
 
-    except requests.exceptions.RequestException as e:
-        return {'error': f'API request failed: {str(e)}'}
+def iter_videos_info(video_ids, api_key, batch_size=MAX_BATCH_SIZE, session=None, cache=None,
+                     parts=None, fields=None):
+    """
+    Stream video information for any number of IDs, MAX_BATCH_SIZE per API call
+
+    IDs are consumed lazily, so `video_ids` may be a generator (e.g. lines of
+    a large file). Each batch is yielded as soon as its response arrives.
+    """
+    batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+    own_session = session is None
+    if own_session:
+        session = requests.Session()
+
+    try:
+        ids = iter(video_ids)
+        while True:
+            batch = list(islice(ids, batch_size))
+            if not batch:
+                break
+            yield from get_videos_info(batch, api_key, session=session, cache=cache,
+                                       parts=parts, fields=fields)
+    finally:
+        if own_session:
+            session.close()
+
+
+def get_video_info(video_id, api_key, cache=None, parts=None, fields=None):
+    """
+    Fetch video information from YouTube Data API v3
+
+    Returns:
+        dict: Video information including title, description, statistics, etc.
+    """
+    try:
+        result = get_videos_info([video_id], api_key, cache=cache, parts=parts, fields=fields)[0]
+    except QuotaExhausted as e:
+        return {'error': str(e)}
+    if 'error' in result:
+        return {'error': result['error']}
+    return result
+
+
+def iter_input_ids(lines, api_key=None, session=None):
+    """
+    Yield video IDs from lines of URLs/IDs, skipping blanks, comments and bad input
+
+    With an `api_key`, playlist and channel URLs are expanded lazily into
+    the IDs of their videos (channel = its uploads playlist).
+    """
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        collection = extract_collection(line) if api_key else None
+        if collection:
+            kind, value = collection
+            try:
+                playlist_id = value if kind == 'playlist' else \
+                    resolve_uploads_playlist(kind, value, api_key, session=session)
+                yield from iter_playlist_video_ids(playlist_id, api_key, session=session)
+            except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+                print(f"Warning: Could not expand {line}: {e}", file=sys.stderr)
+            continue
+
+        video_id = extract_video_id(line)
+        if video_id:
+            yield video_id
+        else:
+            print(f"Warning: Could not extract video ID from: {line}", file=sys.stderr)
+
+
+def format_duration(seconds):
+    """Format seconds as H:MM:SS (or M:SS under an hour)"""
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
 
 
 def format_output(video_info):
@@ -159,25 +877,32 @@ def format_output(video_info):
         return f"Error: {video_info['error']}"
 
     output = []
-    output.append(f"Title: {video_info['title']}")
-    output.append(f"Channel: {video_info['channel']['name']}")
+    if 'title' in video_info:
+        output.append(f"Title: {video_info['title']}")
+    if 'channel' in video_info:
+        output.append(f"Channel: {video_info['channel']['name']}")
     output.append(f"Video URL: {video_info['url']}")
-    output.append(f"Published: {video_info['published_at']}")
-    output.append(f"Duration: {video_info['duration']}")
-    output.append(f"\nStatistics:")
-    output.append(f"  Views: {video_info['statistics']['view_count']:,}")
-    output.append(f"  Likes: {video_info['statistics']['like_count']:,}")
-    output.append(f"  Comments: {video_info['statistics']['comment_count']:,}")
+    if 'published_at' in video_info:
+        output.append(f"Published: {video_info['published_at']}")
+    if 'duration' in video_info:
+        seconds = video_info.get('duration_seconds')
+        output.append(f"Duration: {format_duration(seconds) if seconds is not None else video_info['duration']}")
+    if 'statistics' in video_info:
+        output.append(f"\nStatistics:")
+        output.append(f"  Views: {video_info['statistics']['view_count']:,}")
+        output.append(f"  Likes: {video_info['statistics']['like_count']:,}")
+        output.append(f"  Comments: {video_info['statistics']['comment_count']:,}")
 
     if video_info.get('tags'):
         output.append(f"\nTags: {', '.join(video_info['tags'][:10])}")  # Show first 10 tags
 
-    output.append(f"\nDescription:")
-    # Truncate long descriptions
-    description = video_info['description']
-    if len(description) > 300:
-        description = description[:300] + "..."
-    output.append(description)
+    if 'description' in video_info:
+        output.append(f"\nDescription:")
+        # Truncate long descriptions
+        description = video_info['description']
+        if len(description) > 300:
+            description = description[:300] + "..."
+        output.append(description)
 
     return '\n'.join(output)
 
@@ -192,12 +917,26 @@ Examples:
   %(prog)s "dQw4w9WgXcQ"
   %(prog)s "dQw4w9WgXcQ" --env-file /path/to/.env
   %(prog)s "dQw4w9WgXcQ" --json
+  %(prog)s --batch video_urls.txt > videos.jsonl
+  %(prog)s "dQw4w9WgXcQ" --json --fields title,duration,statistics
+  %(prog)s --batch ids.txt --parts statistics
+  %(prog)s "https://www.youtube.com/playlist?list=PLAYLIST_ID" > playlist.jsonl
+  %(prog)s "https://www.youtube.com/@handle" --fields title,duration,statistics
+  cat ids.txt | %(prog)s --batch -
         """
     )
 
     parser.add_argument(
         'video',
-        help='YouTube video URL or video ID'
+        nargs='?',
+        help='YouTube video URL or video ID, or a playlist/channel URL (streams JSONL)'
+    )
+
+    parser.add_argument(
+        '--batch',
+        metavar='FILE',
+        help="Read URLs/IDs (one per line) from FILE or '-' for stdin and print JSONL, "
+             f"{MAX_BATCH_SIZE} videos per API call; playlist/channel URLs are expanded"
     )
 
     parser.add_argument(
@@ -213,42 +952,99 @@ Examples:
 
     parser.add_argument(
         '--api-key',
-        help='Google API key (alternative to .env file)'
+        help='Google API key, or several comma-separated keys (alternative to .env file)'
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        '--daily-quota',
+        type=int,
+        default=DEFAULT_DAILY_QUOTA,
+        help=f'Daily quota units per key (default: {DEFAULT_DAILY_QUOTA})'
+    )
 
-    # Get API key
-    api_key = args.api_key
+    parser.add_argument(
+        '--low-priority',
+        action='store_true',
+        help=f'Stop before using the last {DEFAULT_QUOTA_RESERVE:.0%%} of each key\'s daily quota'
+    )
 
-    if not api_key:
-        # Try to load from .env file
-        env_vars = load_env_file(args.env_file)
+    parser.add_argument(
+        '--quota-ledger',
+        default=str(DEFAULT_QUOTA_PATH),
+        help=f'Quota usage database (default: {DEFAULT_QUOTA_PATH})'
+    )
 
-        if env_vars and 'GOOGLE_API_KEY' in env_vars:
-            api_key = env_vars['GOOGLE_API_KEY']
-        else:
-            # Try environment variable
-            api_key = os.environ.get('GOOGLE_API_KEY')
+    parser.add_argument(
+        '--parts',
+        help=f'Comma-separated API parts to request (default: {DEFAULT_PARTS})'
+    )
 
-    if not api_key:
+    parser.add_argument(
+        '--fields',
+        help='Comma-separated output fields; only the API fields they need are requested '
+             f"(choose from: {', '.join(OUTPUT_FIELDS)})"
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always fetch from the API instead of the on-disk response cache'
+    )
+
+    parser.add_argument(
+        '--cache-path',
+        default=str(DEFAULT_CACHE_PATH),
+        help=f'Response cache database (default: {DEFAULT_CACHE_PATH})'
+    )
+
+    args = parser.parse_args()
+
+    if not args.video and not args.batch:
+        parser.error('a video URL/ID or --batch FILE is required')
+
+    # Get API keys
+    api_keys = load_api_keys(load_env_file(args.env_file), args.api_key)
+
+    if not api_keys:
         print("Error: GOOGLE_API_KEY not found.", file=sys.stderr)
         print("Please provide API key via:", file=sys.stderr)
         print("  1. --api-key argument", file=sys.stderr)
-        print("  2. GOOGLE_API_KEY in .env file", file=sys.stderr)
+        print("  2. GOOGLE_API_KEY (or comma-separated GOOGLE_API_KEYS) in .env file", file=sys.stderr)
         print("  3. GOOGLE_API_KEY environment variable", file=sys.stderr)
         sys.exit(1)
 
-    # Extract video ID
-    video_id = extract_video_id(args.video)
+    api_key = ApiKeyPool(api_keys, QuotaLedger(args.quota_ledger), daily_quota=args.daily_quota,
+                         low_priority=args.low_priority)
 
-    if not video_id:
-        print(f"Error: Could not extract video ID from: {args.video}", file=sys.stderr)
-        print("Please provide a valid YouTube URL or video ID.", file=sys.stderr)
-        sys.exit(1)
+    parts = args.parts.split(',') if args.parts else None
+    fields = args.fields.split(',') if args.fields else None
+    try:
+        build_projection(parts, fields)
+    except ValueError as e:
+        parser.error(str(e))
+
+    cache = None if args.no_cache else VideoCache(args.cache_path)
+    try:
+        if args.batch:
+            batch_main(args.batch, api_key, cache=cache, parts=parts, fields=fields)
+            return
+        if extract_collection(args.video):
+            stream_jsonl([args.video], api_key, cache=cache, parts=parts, fields=fields)
+            return
+
+        # Extract video ID
+        video_id = extract_video_id(args.video)
+
+        if not video_id:
+            print(f"Error: Could not extract video ID from: {args.video}", file=sys.stderr)
+            print("Please provide a valid YouTube URL or video ID.", file=sys.stderr)
+            sys.exit(1)
 
-    # Fetch video information
-    video_info = get_video_info(video_id, api_key)
+        # Fetch video information
+        video_info = get_video_info(video_id, api_key, cache=cache, parts=parts, fields=fields)
+    finally:
+        if cache is not None:
+            cache.close()
 
     # Output
     if args.json:
@@ -257,5 +1053,44 @@ Examples:
         print(format_output(video_info))
 
 
+def batch_main(source, api_key, cache=None, parts=None, fields=None):
+    """Stream JSONL results for the URLs/IDs listed in `source` ('-' for stdin)"""
+    infile = sys.stdin if source == '-' else open(source, encoding='utf-8')
+    try:
+        stream_jsonl(infile, api_key, cache=cache, parts=parts, fields=fields)
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+
+
+def stream_jsonl(lines, api_key, cache=None, parts=None, fields=None):
+    """Expand, fetch and print one JSON line per video, as each batch arrives"""
+    count = failed = 0
+    stopped = None
+    with requests.Session() as session:
+        video_ids = iter_input_ids(lines, api_key=api_key, session=session)
+        try:
+            for video_info in iter_videos_info(video_ids, api_key, session=session, cache=cache,
+                                               parts=parts, fields=fields):
+                print(json.dumps(video_info, ensure_ascii=False), flush=True)
+                count += 1
+                failed += 'error' in video_info
+        except QuotaExhausted as e:
+            stopped = e
+
+    print(f"Fetched {count} videos ({failed} failed)", file=sys.stderr)
+    if isinstance(api_key, ApiKeyPool):
+        stats = api_key.stats()
+        print(f"Quota: {sum(stats['units_used'])} units used today over {stats['keys']} key(s), "
+              f"{stats['rotations']} rotation(s)", file=sys.stderr)
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Cache: {stats['hits']} fresh, {stats['revalidated']} revalidated (304), "
+              f"{stats['misses']} fetched", file=sys.stderr)
+    if stopped is not None:
+        print(f"Stopped after {count} videos: {stopped}", file=sys.stderr)
+        sys.exit(2)
+
+
 if __name__ == '__main__':
     main()